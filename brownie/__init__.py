@@ -12,6 +12,7 @@ from .project import (
     run,
     __brownie_import_all__
 )
+from .network.multicall import multicall
 from brownie.gui import Gui
 from brownie._config import CONFIG as config
 from brownie.convert import Wei
@@ -20,6 +21,7 @@ __all__ = [
     'accounts',
     'alert',
     'history',
+    'multicall',
     'network',
     'rpc',
     'web3',
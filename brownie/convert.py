@@ -1,5 +1,7 @@
 #!/usr/bin/python3
 
+from functools import lru_cache, partial
+
 import eth_utils
 from hexbytes import HexBytes
 
@@ -71,6 +73,8 @@ class Wei(int):
 
 
 def _to_wei(value):
+    if type(value) is int:
+        return value
     original = value
     if value is None:
         return 0
@@ -84,15 +88,21 @@ def _to_wei(value):
         return _return_int(original, value)
     if value[:2] == "0x":
         return int(value, 16)
+    num, _, unit = value.partition(" ")
+    if unit in UNITS:
+        return _unit_to_int(num, UNITS[unit])
     for unit, dec in UNITS.items():
         if " " + unit not in value:
             continue
-        num = value.split(" ")[0]
-        num = num.split(".") if "." in num else [num, ""]
-        return int(num[0] + num[1][:int(dec)] + "0" * (int(dec) - len(num[1])))
+        return _unit_to_int(value.split(" ")[0], dec)
     return _return_int(original, value)
 
 
+def _unit_to_int(num, dec):
+    num = num.split(".") if "." in num else [num, ""]
+    return int(num[0] + num[1][:int(dec)] + "0" * (int(dec) - len(num[1])))
+
+
 def _return_int(original, value):
     try:
         return int(value)
@@ -118,6 +128,47 @@ def to_int(value, type_="int256"):
     return value
 
 
+def to_wei_list(values):
+    '''Convert a sequence of values to a list of Wei.
+
+    Args:
+        values: list, tuple or other iterable. Objects with a tolist method,
+                such as NumPy arrays, are converted with it first.'''
+    return list(map(Wei, _to_wei_ints(values)))
+
+
+def to_uint_list(values, type_="uint256"):
+    '''Convert a sequence of values to a list of unsigned integers
+
+    Values are converted as with to_uint, and the range is checked once for the
+    whole list.'''
+    size = _check_int_size(type_)
+    return _check_range(_to_wei_ints(values), 0, 2**size, type_)
+
+
+def to_int_list(values, type_="int256"):
+    '''Convert a sequence of values to a list of signed integers
+
+    Values are converted as with to_int, and the range is checked once for the
+    whole list.'''
+    size = _check_int_size(type_)
+    return _check_range(_to_wei_ints(values), -2**size // 2, 2**size // 2, type_)
+
+
+def _to_wei_ints(values):
+    if hasattr(values, "tolist"):
+        values = values.tolist()
+    return list(map(_to_wei, values))
+
+
+def _check_range(values, low, high, type_):
+    # values are plain ints here, comparing Wei objects is much slower
+    if values and (min(values) < low or max(values) >= high):
+        value = next(i for i in values if not low <= i < high)
+        raise OverflowError(f"{value} is outside allowable range for {type_}")
+    return list(map(Wei, values))
+
+
 def _check_int_size(type_):
     size = int(type_.strip("uint") or 256)
     if size < 8 or size > 256 or size // 8 != size / 8:
@@ -127,30 +178,66 @@ def _check_int_size(type_):
 
 class EthAddress(str):
 
-    '''String subclass that raises TypeError when compared to a non-address.'''
+    '''String subclass that raises TypeError when compared to a non-address.
+
+    Comparisons are made against the 20 byte value of the address, held as _key.
+    The hash is that of the checksummed string, the same as for Account and
+    Contract objects, so any of them can be used to look up the others in a dict
+    or set. Plain strings must be checksummed to hash the same.'''
 
     def __new__(cls, value):
-        return super().__new__(cls, to_address(value))
+        address = super().__new__(cls, to_address(value))
+        address._key = bytes.fromhex(address[2:])
+        return address
 
     def __eq__(self, other):
-        return _address_compare(str(self), other)
+        return _address_compare(self, other)
 
     def __ne__(self, other):
-        return not _address_compare(str(self), other)
+        return not _address_compare(self, other)
+
+    __hash__ = str.__hash__
+
+
+def _object_compare(key, other):
+    # equality for Account and Contract objects, which return False rather than
+    # raising when compared to a non-address
+    other_key = getattr(other, "_key", None)
+    if type(other_key) is bytes:
+        return key == other_key
+    if isinstance(other, str):
+        try:
+            return key == bytes.fromhex(to_address(other)[2:])
+        except ValueError:
+            return False
+    return NotImplemented
 
 
 def _address_compare(a, b):
-    b = str(b)
-    if not b.startswith('0x') or not eth_utils.is_hex(b) or len(b) != 42:
-        raise TypeError(f"Invalid type for comparison: '{b}' is not a valid address")
-    return a.lower() == b.lower()
+    # Account, Contract and EthAddress objects all carry a _key
+    key = getattr(b, "_key", None)
+    if type(key) is not bytes:
+        key = _address_key(str(b))
+    return a._key == key
+
+
+@lru_cache(maxsize=65536)
+def _address_key(value):
+    if not value.startswith('0x') or not eth_utils.is_hex(value) or len(value) != 42:
+        raise TypeError(f"Invalid type for comparison: '{value}' is not a valid address")
+    return bytes.fromhex(value[2:])
 
 
 def to_address(value):
     '''Convert a value to an address'''
     if type(value) in (bytes, HexBytes):
         value = HexBytes(value).hex()
-    value = eth_utils.add_0x_prefix(str(value))
+    return _to_checksum_address(eth_utils.add_0x_prefix(str(value)))
+
+
+@lru_cache(maxsize=65536)
+def _to_checksum_address(value):
+    # checksumming requires a keccak hash, results are cached
     try:
         return eth_utils.to_checksum_address(value)
     except ValueError:
@@ -266,7 +353,7 @@ def format_event(event):
     '''Format event data.
 
     Args:
-        event: decoded event as given by eth_event.decode_logs or eth_event.decode_trace
+        event: decoded event as given by event.decode_logs or event.decode_trace
 
     Mutates the event in place and returns it.'''
 
@@ -282,9 +369,13 @@ def format_event(event):
 def _format(abi, key, values):
     try:
         name = abi['name']
-        types = [i['type'] for i in abi[key]]
+        types = tuple(i['type'] for i in abi[key])
     except Exception:
         raise InvalidABI(f"ABI must be a dictionary with name and {key} values.")
+    return _apply(name, types, _compile(key, types), values)
+
+
+def _apply(name, types, plan, values):
     values = list(values)
     if len(values) and not len(types):
         raise TypeError(f"{name} requires no arguments")
@@ -292,45 +383,78 @@ def _format(abi, key, values):
         raise TypeError(
             f"{name} requires {len(types)} arguments ({len(values)} given): {','.join(types)}"
         )
-    for i, type_ in enumerate(types):
-        if "]" in type_:
-            # input value is an array, have to check every item
-            base_type, length = type_[:-1].rsplit('[', maxsplit=1)
-            if type(values[i]) not in (list, tuple):
-                raise TypeError(
-                    f"{name} argument #{i} is type '{type_}' - given value must be a list or tuple"
-                )
-            if length != "" and len(values[i]) != int(length):
-                raise ValueError(
-                    f"{name} argument #{i}, sequence has {len(values[i])} items, should be {type_}"
-                )
-            values[i] = _format(
-                {'name': name, key: [{'type': base_type}] * len(values[i])},
-                key,
-                values[i]
-            )
-            continue
+    for i, convert in enumerate(plan):
+        values[i] = convert(name, i, values[i])
+    return tuple(values)
+
+
+@lru_cache(maxsize=None)
+def _compile(key, types):
+    # returns a tuple of converters for the given types, applied by _apply
+    return tuple(_converter(key, i) for i in types)
+
+
+def _converter(key, type_):
+    if "]" in type_:
+        return _array_converter(key, type_)
+    if "uint" in type_:
+        fn = _int_converter(type_, False)
+    elif "int" in type_:
+        fn = _int_converter(type_, True)
+    elif type_ == "bool":
+        fn = to_bool
+    elif type_ == "address":
+        fn = to_address if key == "inputs" else EthAddress
+    elif "byte" in type_:
+        fn = partial(to_bytes, type_=type_) if key == "inputs" else HexString
+    elif "string" in type_:
+        fn = to_string
+    else:
+        fn = partial(_unknown_type, type_)
+
+    def convert(name, i, value):
         try:
-            if "uint" in type_:
-                values[i] = to_uint(values[i], type_)
-            elif "int" in type_:
-                values[i] = to_int(values[i], type_)
-            elif type_ == "bool":
-                values[i] = to_bool(values[i])
-            elif type_ == "address":
-                if key == "inputs":
-                    values[i] = to_address(values[i])
-                else:
-                    values[i] = EthAddress(values[i])
-            elif "byte" in type_:
-                if key == "inputs":
-                    values[i] = to_bytes(values[i], type_)
-                else:
-                    values[i] = HexString(values[i])
-            elif "string" in type_:
-                values[i] = to_string(values[i])
-            else:
-                raise TypeError(f"Unknown type: {type_}")
+            return fn(value)
         except Exception as e:
-            raise type(e)(f"{name} argument #{i}: '{values[i]}' - {e}")
-    return tuple(values)
+            raise type(e)(f"{name} argument #{i}: '{value}' - {e}")
+    return convert
+
+
+def _int_converter(type_, signed):
+    # same as to_uint and to_int, with the bounds for the type worked out in advance
+    try:
+        size = _check_int_size(type_)
+    except ValueError:
+        return partial(to_int if signed else to_uint, type_=type_)
+    low, high = (-2**size // 2, 2**size // 2) if signed else (0, 2**size)
+
+    def convert(value):
+        value = Wei(value)
+        if not low <= int(value) < high:
+            raise OverflowError(f"{value} is outside allowable range for {type_}")
+        return value
+    return convert
+
+
+def _array_converter(key, type_):
+    # input value is an array, have to check every item
+    base_type, length = type_[:-1].rsplit('[', maxsplit=1)
+    length = int(length) if length else None
+    base_type = (base_type,)
+    base_convert = _compile(key, base_type)[0]
+
+    def convert(name, i, value):
+        if type(value) not in (list, tuple):
+            raise TypeError(
+                f"{name} argument #{i} is type '{type_}' - given value must be a list or tuple"
+            )
+        if length is not None and len(value) != length:
+            raise ValueError(
+                f"{name} argument #{i}, sequence has {len(value)} items, should be {type_}"
+            )
+        return _apply(name, base_type * len(value), (base_convert,) * len(value), value)
+    return convert
+
+
+def _unknown_type(type_, value):
+    raise TypeError(f"Unknown type: {type_}")
@@ -1,11 +1,15 @@
 #!/usr/bin/python3
 
+from concurrent.futures import ProcessPoolExecutor
 from getpass import getpass
 from hexbytes import HexBytes
 import os
 from pathlib import Path
 import json
+import re
+import threading
 
+from eth_account import Account as EthAccount
 from eth_hash.auto import keccak
 import eth_keys
 
@@ -14,39 +18,60 @@ from brownie.exceptions import VirtualMachineError, UnknownAccount
 from brownie.network.transaction import TransactionReceipt
 from .rpc import Rpc
 from .web3 import Web3
-from brownie.convert import to_address, Wei
+from brownie.convert import _object_compare, to_address, Wei
 from brownie._singleton import _Singleton
 from brownie._config import CONFIG
 
 web3 = Web3()
 
+# errors returned by geth, parity and ganache when the nonce is out of sync
+_NONCE_ERRORS = (
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+    "doesn't have the correct nonce"
+)
+
 
 class Accounts(metaclass=_Singleton):
 
-    '''List-like container that holds all of the available Account instances.'''
+    '''List-like container that holds all of the available Account instances.
+
+    Accounts are also indexed by address, so lookups do not scan the list.'''
 
     def __init__(self):
         self._accounts = []
-        # prevent private keys from being stored in read history
+        self._addresses = {}
+        # prevent private keys and passwords from being stored in read history
         self.add.__dict__['_private'] = True
+        self.load_many.__dict__['_private'] = True
         Rpc()._objects.append(self)
         self._reset()
 
     def _reset(self):
-        self._accounts.clear()
+        self.clear()
         try:
-            self._accounts = [Account(i) for i in web3.eth.accounts]
+            addresses = web3.eth.accounts
+            with web3.batch() as batch:
+                nonces = [
+                    batch.request("eth_getTransactionCount", [i, "latest"]) for i in addresses
+                ]
+            self._accounts = [Account(i, j.result()) for i, j in zip(addresses, nonces)]
         except Exception:
             pass
+        self._addresses = dict((i.address, i) for i in self._accounts)
 
     def _revert(self):
-        for i in self._accounts:
-            i.nonce = web3.eth.getTransactionCount(str(i))
+        with web3.batch() as batch:
+            nonces = [
+                batch.request("eth_getTransactionCount", [str(i), "latest"]) for i in self._accounts
+            ]
+        for account, nonce in zip(self._accounts, nonces):
+            account.nonce = nonce.result()
 
     def __contains__(self, address):
         try:
-            address = to_address(address)
-            return address in self._accounts
+            return to_address(address) in self._addresses
         except ValueError:
             return False
 
@@ -60,7 +85,10 @@ class Accounts(metaclass=_Singleton):
         return self._accounts[key]
 
     def __delitem__(self, key):
+        removed = self._accounts[key]
         del self._accounts[key]
+        for account in (removed if type(key) is slice else [removed]):
+            del self._addresses[account.address]
 
     def __len__(self):
         return len(self._accounts)
@@ -77,10 +105,11 @@ class Accounts(metaclass=_Singleton):
         if not priv_key:
             priv_key = "0x"+keccak(os.urandom(8192)).hex()
         w3account = web3.eth.account.privateKeyToAccount(priv_key)
-        if w3account.address in self._accounts:
+        if w3account.address in self._addresses:
             return self.at(w3account.address)
         account = LocalAccount(w3account.address, w3account, priv_key)
         self._accounts.append(account)
+        self._addresses[account.address] = account
         return account
 
     def load(self, filename=None):
@@ -92,17 +121,9 @@ class Accounts(metaclass=_Singleton):
 
         Returns:
             Account instance.'''
-        project_path = Path(CONFIG['folders']['brownie']).joinpath("data/accounts")
         if not filename:
-            return [i.stem for i in project_path.glob('*.json')]
-        filename = str(filename)
-        if not filename.endswith(".json"):
-            filename += ".json"
-        json_file = Path(filename).expanduser()
-        if not json_file.exists():
-            json_file = project_path.joinpath(filename)
-            if not json_file.exists():
-                raise FileNotFoundError(f"Cannot find {json_file}")
+            return [i.stem for i in _keystore_path().glob('*.json')]
+        json_file = _find_keystore(filename)
         with json_file.open() as fp:
             priv_key = web3.eth.account.decrypt(
                 json.load(fp),
@@ -110,6 +131,47 @@ class Accounts(metaclass=_Singleton):
             )
         return self.add(priv_key)
 
+    def load_many(self, names, password_provider=None):
+        '''Loads many local accounts from keystore files.
+
+        Keystores are decrypted in parallel in a pool of processes, and the
+        accounts are added to the container once all of them are decrypted.
+
+        Args:
+            names: Sequence of keystore filenames.
+            password_provider: Optional callable that is given each filename and
+                               returns its password. If none is given, the
+                               password for each keystore is requested.
+
+        Returns:
+            List of Account instances, in the same order as names.'''
+        keystores = []
+        for name in names:
+            with _find_keystore(name).open() as fp:
+                keystores.append(json.load(fp))
+        if password_provider is None:
+            passwords = [getpass(f"Enter the password for '{i}': ") for i in names]
+        else:
+            passwords = [password_provider(i) for i in names]
+        with ProcessPoolExecutor() as executor:
+            keys = list(executor.map(_decrypt, keystores, passwords))
+
+        addresses = []
+        new = {}
+        for priv_key in keys:
+            w3account = web3.eth.account.privateKeyToAccount(priv_key)
+            if w3account.address not in self._addresses:
+                new[w3account.address] = (w3account, priv_key)
+            addresses.append(w3account.address)
+        with web3.batch() as batch:
+            nonces = [batch.request("eth_getTransactionCount", [i, "latest"]) for i in new]
+        new = dict(
+            (k, LocalAccount(k, *v, nonce.result())) for (k, v), nonce in zip(new.items(), nonces)
+        )
+        self._accounts.extend(new.values())
+        self._addresses.update(new)
+        return [self._addresses[i] for i in addresses]
+
     def at(self, address):
         '''Retrieves an Account instance from the address string. Raises
         ValueError if the account cannot be found.
@@ -122,9 +184,9 @@ class Accounts(metaclass=_Singleton):
         '''
         address = to_address(address)
         try:
-            return next(i for i in self._accounts if i == address)
-        except StopIteration:
-            raise UnknownAccount(f"No account exists for {address}")
+            return self._addresses[address]
+        except KeyError:
+            raise UnknownAccount(f"No account exists for {address}") from None
 
     def remove(self, address):
         '''Removes an account instance from the container.
@@ -133,22 +195,27 @@ class Accounts(metaclass=_Singleton):
             address: Account instance or address string of account to remove.'''
         address = to_address(address)
         try:
-            self._accounts.remove(address)
-        except ValueError:
-            raise UnknownAccount(f"No account exists for {address}")
+            account = self._addresses.pop(address)
+        except KeyError:
+            raise UnknownAccount(f"No account exists for {address}") from None
+        self._accounts.remove(account)
 
     def clear(self):
         '''Empties the container.'''
         self._accounts.clear()
+        self._addresses.clear()
 
 
 class _AccountBase:
 
     '''Base class for Account and LocalAccount'''
 
-    def __init__(self, addr):
+    def __init__(self, addr, nonce=None):
         self.address = addr
-        self.nonce = web3.eth.getTransactionCount(self.address)
+        self._key = bytes.fromhex(addr[2:])
+        if nonce is None:
+            nonce = web3.eth.getTransactionCount(self.address)
+        self._nonces = _NonceManager(addr, nonce)
 
     def __hash__(self):
         return hash(self.address)
@@ -160,13 +227,16 @@ class _AccountBase:
         return self.address
 
     def __eq__(self, other):
-        if type(other) is str:
-            try:
-                address = to_address(other)
-                return address == self.address
-            except ValueError:
-                return False
-        return super().__eq__(other)
+        # compared by the 20 byte address, hashed by the checksummed string
+        return _object_compare(self._key, other)
+
+    @property
+    def nonce(self):
+        return self._nonces.nonce
+
+    @nonce.setter
+    def nonce(self, value):
+        self._nonces.nonce = value
 
     def _gas_limit(self, to, amount, data=""):
         if type(CONFIG['active_network']['gas_limit']) is int:
@@ -210,19 +280,13 @@ class _AccountBase:
             * Contract instance if the transaction confirms
             * TransactionReceipt if the transaction is pending or reverts'''
         data = contract.deploy.encode_abi(*args)
-        try:
-            txid = self._transact({
-                'from': self.address,
-                'value': Wei(amount),
-                'nonce': self.nonce,
-                'gasPrice': Wei(gas_price) or self._gas_price(),
-                'gas': Wei(gas_limit) or self._gas_limit("", amount, data),
-                'data': HexBytes(data)
-            })
-            revert = None
-        except ValueError as e:
-            txid, revert = _raise_or_return_tx(e)
-        self.nonce += 1
+        txid, revert = self._send({
+            'from': self.address,
+            'value': Wei(amount),
+            'gasPrice': Wei(gas_price) or self._gas_price(),
+            'gas': Wei(gas_limit) or self._gas_limit("", amount, data),
+            'data': HexBytes(data)
+        })
         tx = TransactionReceipt(
             txid,
             self,
@@ -267,22 +331,92 @@ class _AccountBase:
 
         Returns:
             TransactionReceipt object'''
-        try:
-            txid = self._transact({
-                'from': self.address,
-                'to': str(to),
-                'value': Wei(amount),
-                'nonce': self.nonce,
-                'gasPrice': Wei(gas_price) if gas_price is not None else self._gas_price(),
-                'gas': Wei(gas_limit) or self._gas_limit(to, amount, data),
-                'data': HexBytes(data)
-            })
-            revert = None
-        except ValueError as e:
-            txid, revert = _raise_or_return_tx(e)
-        self.nonce += 1
+        txid, revert = self._send(self._transfer_tx(to, amount, gas_limit, gas_price, data))
         return TransactionReceipt(txid, self, revert=revert)
 
+    def send_many(self, transactions, wait=True):
+        '''Broadcasts many transfers back to back, without waiting for each one
+        to confirm before sending the next.
+
+        Only the arguments of Account.transfer are supported. Contract calls
+        can be sent by giving the encoded calldata as 'data'.
+
+        Args:
+            transactions: Sequence of dicts. Each must contain 'to', and may
+                          contain 'amount', 'gas_limit', 'gas_price' and 'data'.
+            wait: If True, waits until every transaction has confirmed before
+                  returning. Otherwise call TransactionReceipt.wait on each.
+
+        Returns:
+            List of TransactionReceipt objects, in the order they were sent.
+
+        Raises VirtualMachineError when waiting, after every transaction has
+        confirmed, if any of them reverted. If a transaction cannot be
+        broadcast the error is raised immediately and later ones are not sent.'''
+        receipts = []
+        for tx in transactions:
+            txid, revert = self._send(self._transfer_tx(
+                tx['to'],
+                tx.get('amount', 0),
+                tx.get('gas_limit'),
+                tx.get('gas_price'),
+                tx.get('data', "")
+            ))
+            receipts.append(TransactionReceipt(txid, self, revert=revert, wait=False))
+        if not wait:
+            return receipts
+        failed = []
+        for tx in receipts:
+            try:
+                tx.wait()
+            except VirtualMachineError as e:
+                failed.append(f"{tx.txid}: {e}")
+        if failed:
+            raise VirtualMachineError({
+                'message': f"{len(failed)} of {len(receipts)} transactions reverted",
+                'source': "\n".join(failed)
+            })
+        return receipts
+
+    def _transfer_tx(self, to, amount, gas_limit, gas_price, data):
+        return {
+            'from': self.address,
+            'to': str(to),
+            'value': Wei(amount),
+            'gasPrice': Wei(gas_price) if gas_price is not None else self._gas_price(),
+            'gas': Wei(gas_limit) or self._gas_limit(to, amount, data),
+            'data': HexBytes(data)
+        }
+
+    def _send(self, tx):
+        # the nonce manager is held while broadcasting, so that transactions sent
+        # from other threads are given consecutive nonces. the nonce is only used
+        # up if the transaction was broadcast.
+        with self._nonces:
+            for retry in (True, False):
+                tx['nonce'] = self._nonces.nonce
+                try:
+                    result = self._transact(tx), None
+                except ValueError as e:
+                    message = _error_message(e)
+                    if retry and _is_nonce_error(message):
+                        # the local nonce is out of sync with the network
+                        self._nonces.sync()
+                        continue
+                    txid = self._known_txid(tx, message)
+                    # the node already has this transaction, it is not sent again
+                    result = (txid, None) if txid else _raise_or_return_tx(e)
+                self._nonces.nonce += 1
+                return result
+
+    def _known_txid(self, tx, message):
+        # returns the hash of a transaction that the node reports it already has,
+        # if the node includes it in the error message
+        if "known transaction" not in message:
+            return None
+        match = re.search(r"known transaction: (?:0x)?([0-9a-f]{64})", message)
+        return "0x" + match.group(1) if match else None
+
 
 class Account(_AccountBase):
 
@@ -310,11 +444,11 @@ class LocalAccount(_AccountBase):
         private_key: Account private key.
         public_key: Account public key.'''
 
-    def __init__(self, address, account, priv_key):
+    def __init__(self, address, account, priv_key, nonce=None):
         self._acct = account
         self.private_key = priv_key
         self.public_key = eth_keys.keys.PrivateKey(HexBytes(priv_key)).public_key
-        super().__init__(address)
+        super().__init__(address, nonce)
 
     def __repr__(self):
         return f"<LocalAccount object '{color['string']}{self.address}{color}'>"
@@ -329,7 +463,7 @@ class LocalAccount(_AccountBase):
 
         Returns the absolute path to the keystore file as a string.
         '''
-        path = Path(CONFIG['folders']['brownie']).joinpath('data/accounts')
+        path = _keystore_path()
         path.mkdir(exist_ok=True)
         filename = str(filename)
         if not filename.endswith(".json"):
@@ -353,6 +487,76 @@ class LocalAccount(_AccountBase):
         signed_tx = self._acct.signTransaction(tx).rawTransaction
         return web3.eth.sendRawTransaction(signed_tx)
 
+    def _known_txid(self, tx, message):
+        if "known transaction" not in message:
+            return None
+        # signing is deterministic, so the hash is the same as the one broadcast
+        return self._acct.signTransaction(tx).hash.hex()
+
+
+class _NonceManager:
+
+    '''Tracks the nonce of an account and hands out nonces between threads.
+
+    Used as a context manager, the manager is locked so that a nonce can be
+    read, used and incremented atomically.'''
+
+    def __init__(self, address, nonce):
+        self.address = address
+        self.nonce = nonce
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._lock.release()
+
+    def sync(self):
+        '''Sets the nonce from the transaction count of the account, including
+        pending transactions. Used when a gap between the local and network nonce
+        is detected.'''
+        with self._lock:
+            self.nonce = web3.eth.getTransactionCount(self.address, "pending")
+
+
+def _error_message(exc):
+    # only the message is checked, revert errors from ganache include a stack trace
+    message = exc.args[0] if exc.args else ""
+    if type(message) is dict:
+        message = message.get('message', "")
+    return str(message).lower()
+
+
+def _is_nonce_error(message):
+    # a revert reason may mention a nonce, the transaction was still mined
+    if "vm exception" in message:
+        return False
+    return any(i in message for i in _NONCE_ERRORS)
+
+
+def _keystore_path():
+    return Path(CONFIG['folders']['brownie']).joinpath("data/accounts")
+
+
+def _find_keystore(filename):
+    filename = str(filename)
+    if not filename.endswith(".json"):
+        filename += ".json"
+    json_file = Path(filename).expanduser()
+    if not json_file.exists():
+        json_file = _keystore_path().joinpath(filename)
+        if not json_file.exists():
+            raise FileNotFoundError(f"Cannot find {json_file}")
+    return json_file
+
+
+def _decrypt(keystore, password):
+    # runs in a child process when called from Accounts.load_many. this is the
+    # function behind web3.eth.account.decrypt, called without creating a provider
+    return EthAccount.decrypt(keystore, password)
+
 
 def _raise_or_return_tx(exc):
     try:
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+
+from collections import OrderedDict
+import json
+import threading
+import time
+
+from .web3 import Web3, _batch_context
+from brownie._singleton import _Singleton
+
+web3 = Web3()
+
+# methods that only read state, their results can be cached until the next block
+_CACHED = {
+    'eth_call',
+    'eth_getBalance',
+    'eth_getCode',
+    'eth_getStorageAt',
+    'eth_getTransactionCount'
+}
+# methods that modify state, the cache is cleared whenever one is sent
+_WRITES = {
+    'eth_sendTransaction',
+    'eth_sendRawTransaction',
+    'personal_sendTransaction'
+}
+
+
+class ReadCache(metaclass=_Singleton):
+
+    '''Opt-in cache for JSON-RPC requests that read state.
+
+    Results for eth_call, eth_getBalance, eth_getCode, eth_getStorageAt and
+    eth_getTransactionCount are cached by method, params and block number. The
+    block number is checked at most once every ttl seconds, and the cache is
+    cleared when it changes. The cache is also cleared when a transaction is
+    sent or the test RPC is mined, reverted or reset. Once the cache holds more
+    than size entries, the least recently used entry is evicted.
+
+    The cache is a web3 middleware, so it applies to every request made through
+    Web3 and RPCBatch. The requests in a batch share one block number check, and
+    each is counted once as a hit or a miss.'''
+
+    def __init__(self):
+        self.size = 0
+        self.ttl = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = OrderedDict()
+        self._block = None
+        self._checked = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __repr__(self):
+        return f"<ReadCache object {'enabled' if self.is_enabled() else 'disabled'} {self.stats()}>"
+
+    def is_enabled(self):
+        '''Returns True if the cache is enabled.'''
+        return 'read_cache' in web3.middleware_stack
+
+    def enable(self, size=1000, ttl=1):
+        '''Enables the cache.
+
+        Args:
+            size: Maximum number of cached results.
+            ttl: Number of seconds a cached block number is trusted for. Blocks
+                 mined by other clients within this time may return stale results.'''
+        if size < 1:
+            raise ValueError("size must be greater than zero")
+        self.size = size
+        self.ttl = ttl
+        if not self.is_enabled():
+            web3.middleware_stack.inject(self._middleware, 'read_cache', layer=0)
+        self.clear()
+
+    def disable(self):
+        '''Disables and clears the cache.'''
+        if self.is_enabled():
+            web3.middleware_stack.remove('read_cache')
+        self.clear()
+
+    def clear(self):
+        '''Removes all cached results.'''
+        with self._lock:
+            self._cache.clear()
+            self._block = None
+            self._checked = 0
+
+    def stats(self):
+        '''Returns a dict of the hit, miss and eviction counters.'''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._cache)
+        }
+
+    def reset_stats(self):
+        '''Sets the hit, miss and eviction counters to zero.'''
+        self.hits = self.misses = self.evictions = 0
+
+    def _middleware(self, make_request, _web3):
+        def middleware(method, params):
+            if method not in _CACHED:
+                if method in _WRITES or method.startswith("evm_"):
+                    self.clear()
+                return make_request(method, params)
+            try:
+                key = (method, json.dumps(params, sort_keys=True), self._height())
+            except Exception:
+                return make_request(method, params)
+            with self._lock:
+                if key in self._cache:
+                    self.hits += 1
+                    self._cache.move_to_end(key)
+                    return self._cache[key]
+            # a request queued by RPCBatch raises here, it is counted when the batch
+            # is sent and the response passes back through
+            response = make_request(method, params)
+            with self._lock:
+                self.misses += 1
+            if "result" in response:
+                self._store(key, response)
+            return response
+        return middleware
+
+    def _height(self):
+        # the block number is checked once for all of the requests in a batch
+        context = _batch_context()
+        if context is None:
+            return self._get_height()
+        if 'read_cache_height' not in context:
+            context['read_cache_height'] = self._get_height()
+        return context['read_cache_height']
+
+    def _get_height(self):
+        # the provider is called directly so that requests made by RPCBatch are
+        # not diverted, a new block number clears the cache
+        if time.time() - self._checked < self.ttl:
+            return self._block
+        response = web3.providers[0].make_request("eth_blockNumber", [])
+        height = int(response['result'], 16)
+        with self._lock:
+            if height != self._block:
+                self._cache.clear()
+                self._block = height
+            self._checked = time.time()
+        return height
+
+    def _store(self, key, response):
+        with self._lock:
+            if key[2] != self._block:
+                # a new block was seen while the request was in flight
+                return
+            self._cache[key] = response
+            while len(self._cache) > self.size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
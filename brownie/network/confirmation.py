@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+
+import threading
+
+from .web3 import Web3
+from brownie._singleton import _Singleton
+
+web3 = Web3()
+
+
+class PendingTx:
+
+    '''A transaction that is awaiting confirmation.'''
+
+    __slots__ = ('tx', 'silent', 'callback', 'seen', 'head', 'error', '_event')
+
+    def __init__(self, tx, silent, callback):
+        self.tx = tx
+        self.silent = silent
+        self.callback = callback
+        self.seen = False
+        self.head = -1
+        self.error = None
+        self._event = threading.Event()
+
+    def is_done(self):
+        return self._event.is_set()
+
+    def wait(self):
+        '''Blocks until the transaction has confirmed. If an exception was raised
+        while awaiting confirmation, it is raised again here.'''
+        self._event.wait()
+        if self.error is not None:
+            raise self.error
+
+    def _done(self, error=None):
+        self.error = error
+        self._event.set()
+
+
+class ConfirmationEngine(metaclass=_Singleton):
+
+    '''Awaits confirmation of every pending transaction from a single thread.
+
+    Transactions that have not yet been seen are queried on each loop. Receipts
+    for the rest are only requested after a new block is mined, detected with
+    a block filter or by polling the block number if filters are unavailable.
+    The requests for each check are sent as a single JSON-RPC batch. The thread
+    exits once there are no pending transactions, the block filter is kept for
+    use when it is next started.'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = []
+        self._thread = None
+        self._filter = None
+        self._height = None
+        self._head = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, tx, silent=False, callback=None):
+        '''Adds a transaction to be confirmed.
+
+        Args:
+            tx: TransactionReceipt object.
+            silent: toggles console verbosity
+            callback: optional callback function
+
+        Returns: PendingTx object, call PendingTx.wait() to block until confirmed.'''
+        pending = PendingTx(tx, silent, callback)
+        with self._lock:
+            self._pending.append(pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return pending
+
+    def _loop(self):
+        if self._filter is None:
+            try:
+                self._filter = web3.eth.filter('latest')
+            except ValueError:
+                # filters are not supported, poll the block number instead
+                self._filter = False
+        self._height = None
+        while True:
+            # cleared before the snapshot so that a transaction added after it
+            # wakes the next wait
+            self._wake.clear()
+            with self._lock:
+                self._pending = [i for i in self._pending if not i.is_done()]
+                if not self._pending:
+                    self._thread = None
+                    return
+                pending = self._pending.copy()
+            self._check(pending)
+            self._wake.wait(0.5)
+            try:
+                if self._new_block():
+                    self._head += 1
+            except Exception as e:
+                # the connection has failed, raise the error for everything pending
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                    block_filter, self._filter = self._filter, None
+                    self._thread = None
+                if block_filter:
+                    try:
+                        web3.eth.uninstallFilter(block_filter.filter_id)
+                    except Exception:
+                        pass
+                for i in pending:
+                    i._done(e)
+                return
+
+    def _check(self, pending):
+        # transactions and receipts for everything pending are requested in one batch
+        queue = []
+        with web3.batch() as batch:
+            for i in pending:
+                tx = receipt = None
+                if not i.seen:
+                    tx = batch.request("eth_getTransaction", [i.tx.txid])
+                if tx is not None or i.head != self._head:
+                    i.head = self._head
+                    receipt = batch.request("eth_getTransactionReceipt", [i.tx.txid])
+                queue.append((i, tx, receipt))
+
+        for i, tx, receipt in queue:
+            try:
+                if tx is not None:
+                    data = tx.result()
+                    if not data:
+                        continue
+                    i.tx._set_from_tx(data)
+                    i.seen = True
+                    if not data['blockNumber'] and not i.silent:
+                        print("Waiting for confirmation...")
+                if receipt is None:
+                    continue
+                data = receipt.result()
+                if not data or data['blockNumber'] is None:
+                    continue
+                i.tx._set_from_receipt(data)
+                if not i.silent:
+                    print(i.tx._confirm_output())
+                if i.callback:
+                    i.callback(i.tx)
+            except Exception as e:
+                i._done(e)
+                continue
+            i._done()
+
+    def _new_block(self):
+        # returns True if a block has been mined since the last check
+        if self._filter:
+            try:
+                return bool(self._filter.get_new_entries())
+            except ValueError:
+                # the filter has expired, poll until the thread next starts
+                self._filter = None
+        height = web3.eth.blockNumber
+        if height == self._height:
+            return False
+        self._height = height
+        return True
@@ -1,22 +1,29 @@
 #!/usr/bin/python3
 
+from concurrent.futures import Future
+from functools import lru_cache
 import re
 
-import eth_abi
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.encoding import TupleEncoder
+from eth_abi.registry import registry
 from eth_hash.auto import keccak
 from hexbytes import HexBytes
 
 from brownie.cli.utils import color
-from .event import get_topics
+from .event import ContractEvents, get_topics
 from .history import _ContractHistory
+from .multicall import _active_multicall
 from .rpc import Rpc
 from .web3 import Web3
 from .return_value import ReturnValue
-from brownie.convert import format_input, format_output, to_address, Wei
+from brownie.convert import _object_compare, format_input, format_output, to_address, Wei
 from brownie.exceptions import UndeployedLibrary, VirtualMachineError
+from brownie.project import build
 from brownie._config import ARGV, CONFIG
 
 _contracts = _ContractHistory()
+_method_tables = {}
 rpc = Rpc()
 web3 = Web3()
 
@@ -30,15 +37,57 @@ class _ContractBase:
         self.abi = build['abi']
         self._name = build['contractName']
         self._source_path = build['sourcePath']
-        self.topics = get_topics(self.abi)
-        self.signatures = dict((
-            i['name'],
-            _signature(i)
-        ) for i in self.abi if i['type'] == "function")
+        self._methods = _get_method_table(self._name, self.abi)
+        self.topics = self._methods.topics
+        self.signatures = self._methods.signatures
 
     def get_method(self, calldata):
-        sig = calldata[:10].lower()
-        return next((k for k, v in self.signatures.items() if v == sig), None)
+        abi = self._methods.selectors.get(calldata[:10].lower())
+        return abi['name'] if abi else None
+
+    def decode_input(self, calldata):
+        '''Decodes the calldata for a call to one of this contract's methods.
+
+        Args:
+            calldata: Calldata as a hex string or bytes.
+
+        Returns: (method name, [decoded inputs])'''
+        calldata = HexBytes(calldata)
+        abi = self._methods.selectors.get(calldata[:4].hex())
+        if abi is None:
+            raise ValueError(f"No method in {self._name} matches selector {calldata[:4].hex()}")
+        return abi['name'], _decode_input(abi, calldata)
+
+
+class _MethodTable:
+
+    '''Function ABIs, signatures and topics for a contract type. A single table is
+    shared by the ContractContainer and every Contract created from it, so that
+    signatures are only computed once. Method objects are bound to a contract
+    address when they are first accessed.'''
+
+    def __init__(self, name, abi):
+        self.name = name
+        self.fns = {}
+        for fn_abi in [i for i in abi if i['type'] == "function"]:
+            self.fns.setdefault(fn_abi['name'], []).append((fn_abi, _signature(fn_abi)))
+        self.signatures = dict((k, v[-1][1]) for k, v in self.fns.items())
+        self.selectors = dict((x[1], x[0]) for v in self.fns.values() for x in v)
+        self.topics = get_topics(abi)
+
+    def bind(self, name, address, owner):
+        '''Returns a ContractCall, ContractTx or OverloadedMethod for the given
+        function name, bound to an address.'''
+        full_name = f"{self.name}.{name}"
+        fns = self.fns[name]
+        if len(fns) == 1:
+            abi, signature = fns[0]
+            return _get_method_object(address, abi, full_name, owner, signature)
+        method = OverloadedMethod(address, full_name, owner)
+        for abi, signature in fns:
+            key = ",".join(i['type'] for i in abi['inputs']).replace('256', '')
+            method.methods[key] = _get_method_object(address, abi, full_name, owner, signature)
+        return method
 
 
 class ContractContainer(_ContractBase):
@@ -49,6 +98,7 @@ class ContractContainer(_ContractBase):
     Attributes:
         abi: Complete contract ABI.
         bytecode: Bytecode used to deploy the contract.
+        events: ContractEvents object, used to query historical events.
         signatures: Dictionary of {'function name': "bytes4 signature"}
         topics: Dictionary of {'event name': "bytes32 topic"}'''
 
@@ -57,16 +107,21 @@ class ContractContainer(_ContractBase):
         self.bytecode = build['bytecode']
         super().__init__(build)
         self.deploy = ContractConstructor(self, self._name)
+        self.events = ContractEvents(self)
 
     def __iter__(self):
-        return iter(_contracts.list(self._name))
+        return iter(_contracts.list(self._name).copy())
 
     def __getitem__(self, i):
         return _contracts.list(self._name)[i]
 
     def __delitem__(self, key):
         item = _contracts.list(self._name)[key]
-        _contracts.remove(item)
+        if type(item) is list:
+            for contract in item:
+                _contracts.remove(contract)
+        else:
+            _contracts.remove(item)
 
     def __len__(self):
         return len(_contracts.list(self._name))
@@ -98,9 +153,11 @@ class ContractContainer(_ContractBase):
             if contract._name == self._name:
                 return contract
             raise ValueError(f"Contract '{contract._name}' already declared at {address}")
-        if web3.eth.getCode(address).hex() == "0x":
+        bytecode = web3.eth.getCode(address).hex()
+        if bytecode == "0x":
             raise ValueError(f"No contract deployed at {address}")
         contract = Contract(address, self._build, owner, tx)
+        contract._bytecode = bytecode[2:]
         _contracts.add(contract)
         return contract
 
@@ -121,6 +178,7 @@ class ContractConstructor:
                 'type': "constructor"
             }
         self._name = name
+        self._encoder = None
 
     def __repr__(self):
         return f"<{type(self).__name__} object '{self._name}.constructor({_inputs(self.abi)})'>"
@@ -169,9 +227,9 @@ class ContractConstructor:
             address = _contracts.list(library)[-1].address[-40:]
             bytecode = bytecode.replace(marker, address)
 
-        data = format_input(self.abi, args)
-        types = [i['type'] for i in self.abi['inputs']]
-        return bytecode + eth_abi.encode_abi(types, data).hex()
+        if self._encoder is None:
+            self._encoder = _get_encoder(self.abi['inputs'])
+        return bytecode + self._encoder(format_input(self.abi, args)).hex()
 
 
 class Contract(_ContractBase):
@@ -179,36 +237,53 @@ class Contract(_ContractBase):
     '''Methods for interacting with a deployed contract.
 
     Each public contract method is available as a ContractCall or ContractTx
-    instance, created when this class is instantiated.
+    instance, created when the method is first accessed.
 
     Attributes:
         bytecode: Bytecode of the deployed contract, including constructor args.
+                  Only requested from the RPC when it is first accessed.
+        events: ContractEvents object, used to query historical events.
         tx: TransactionReceipt of the of the tx that deployed the contract.'''
 
     def __init__(self, address, build, owner, tx=None):
         super().__init__(build)
         self.tx = tx
-        self.bytecode = web3.eth.getCode(address).hex()[2:]
+        self._bytecode = None
         self._owner = owner
         self.address = address
-        fn_names = [i['name'] for i in self.abi if i['type'] == "function"]
-        for abi in [i for i in self.abi if i['type'] == "function"]:
-            name = f"{self._name}.{abi['name']}"
-            if fn_names.count(abi['name']) == 1:
-                self._check_and_set(abi['name'], _get_method_object(address, abi, name, owner))
-                continue
-            if not hasattr(self, abi['name']):
-                self._check_and_set(abi['name'], OverloadedMethod(address, name, owner))
-            key = ",".join(i['type'] for i in abi['inputs']).replace('256', '')
-            getattr(self, abi['name']).methods[key] = _get_method_object(address, abi, name, owner)
+        self._key = bytes.fromhex(address[2:])
+        for name in self._methods.fns:
+            if name in self.__dict__ or hasattr(type(self), name):
+                raise AttributeError(f"Namespace collision: '{self._name}.{name}'")
+        if 'events' not in self._methods.fns:
+            self.events = ContractEvents(self)
+
+    def __getattr__(self, name):
+        # contract methods are bound to this instance the first time they are accessed
+        methods = self.__dict__.get('_methods')
+        if methods is None or name not in methods.fns:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        method = methods.bind(name, self.address, self._owner)
+        self.__dict__[name] = method
+        return method
+
+    @property
+    def __console_dir__(self):
+        return sorted(
+            [i for i in self.__dict__ if not i.startswith('_')] +
+            [i for i in self._methods.fns if i not in self.__dict__] +
+            ['balance', 'bytecode']
+        )
 
-    def _check_and_set(self, name, obj):
-        if hasattr(self, name):
-            raise AttributeError(f"Namespace collision: '{self._name}.{name}'")
-        setattr(self, name, obj)
+    @property
+    def bytecode(self):
+        if self._bytecode is None:
+            self._bytecode = web3.eth.getCode(self.address).hex()[2:]
+        return self._bytecode
 
     def __hash__(self):
-        return hash(self._name+self.address)
+        # the same as the hash of an Account, EthAddress or checksummed string
+        return hash(self.address)
 
     def __repr__(self):
         return f"<{self._name} Contract object '{color['string']}{self.address}{color}'>"
@@ -218,14 +293,8 @@ class Contract(_ContractBase):
 
     def __eq__(self, other):
         if type(other) is Contract:
-            return self.address == other.address and self.bytecode == other.bytecode
-        if type(other) is str:
-            try:
-                address = to_address(other)
-                return address == self.address
-            except ValueError:
-                return False
-        return super().__eq__(other)
+            return self._key == other._key and self.bytecode == other.bytecode
+        return _object_compare(self._key, other)
 
     def balance(self):
         '''Returns the current ether balance of the contract, in wei.'''
@@ -258,12 +327,15 @@ class _ContractMethod:
 
     _dir_color = "contract_method"
 
-    def __init__(self, address, abi, name, owner):
+    def __init__(self, address, abi, name, owner, signature=None):
         self._address = address
         self._name = name
         self.abi = abi
         self._owner = owner
-        self.signature = _signature(abi)
+        self.signature = signature or _signature(abi)
+        # eth_abi coders are resolved on first use
+        self._encoder = None
+        self._decoder = None
 
     def __repr__(self):
         pay = "payable " if self.abi['stateMutability'] == "payable" else ""
@@ -277,11 +349,17 @@ class _ContractMethod:
                    dictionary of transaction properties as the last arg.
 
         Returns:
-            Contract method return value(s).'''
+            Contract method return value(s). Inside a multicall context, a
+            Future that is resolved with the return value when the calls are sent.'''
+        # a call with an explicit sender cannot be aggregated
+        sender = bool(args and type(args[-1]) is dict and args[-1].get('from'))
         args, tx = _get_tx(self._owner, args)
         if tx['from']:
             tx['from'] = str(tx['from'])
         tx.update({'to': self._address, 'data': self.encode_abi(*args)})
+        multicall = _active_multicall()
+        if multicall is not None:
+            return multicall._add(self, tx, aggregate=not sender)
         try:
             data = web3.eth.call(dict((k, v) for k, v in tx.items() if v))
         except ValueError as e:
@@ -319,9 +397,19 @@ class _ContractMethod:
 
         Returns:
             Hexstring of encoded ABI data.'''
-        data = format_input(self.abi, args)
-        types = [i['type'] for i in self.abi['inputs']]
-        return self.signature + eth_abi.encode_abi(types, data).hex()
+        if self._encoder is None:
+            self._encoder = _get_encoder(self.abi['inputs'])
+        return self.signature + self._encoder(format_input(self.abi, args)).hex()
+
+    def encode_many(self, args_list):
+        '''Returns encoded ABI data for many sets of arguments.
+
+        Args:
+            args_list: Sequence where each item is a sequence of contract method inputs
+
+        Returns:
+            List of hexstrings of encoded ABI data.'''
+        return [self.encode_abi(*args) for args in args_list]
 
     def decode_abi(self, hexstr):
         '''Decodes hexstring data returned by this method.
@@ -330,12 +418,22 @@ class _ContractMethod:
             hexstr: Hexstring of returned call data
 
         Returns: Decoded values.'''
-        result = eth_abi.decode_abi([i['type'] for i in self.abi['outputs']], HexBytes(hexstr))
-        result = format_output(self.abi, result)
+        if self._decoder is None:
+            self._decoder = _get_decoder(self.abi['outputs'])
+        result = format_output(self.abi, self._decoder(ContextFramesBytesIO(HexBytes(hexstr))))
         if len(result) == 1:
             return result[0]
         return ReturnValue(result, self.abi)
 
+    def decode_many(self, hexstr_list):
+        '''Decodes many hexstrings of data returned by this method.
+
+        Args:
+            hexstr_list: Sequence of hexstrings of returned call data
+
+        Returns: List of decoded values.'''
+        return [self.decode_abi(i) for i in hexstr_list]
+
 
 class ContractTx(_ContractMethod):
 
@@ -345,10 +443,10 @@ class ContractTx(_ContractMethod):
         abi: Contract ABI specific to this method.
         signature: Bytes4 method signature.'''
 
-    def __init__(self, fn, abi, name, owner):
+    def __init__(self, fn, abi, name, owner, signature=None):
         if ARGV['cli'] == "test" and CONFIG['test']['default_contract_owner'] is False:
             owner = None
-        super().__init__(fn, abi, name, owner)
+        super().__init__(fn, abi, name, owner, signature)
 
     def __call__(self, *args):
         '''Broadcasts a transaction that calls this contract method.
@@ -378,9 +476,21 @@ class ContractCall(_ContractMethod):
                    dictionary of transaction properties as the last arg.
 
         Returns:
-            Contract method return value(s).'''
+            Contract method return value(s). Inside a multicall context, a
+            Future that is resolved with the return value.'''
         if not ARGV['always_transact']:
             return self.call(*args)
+        if _active_multicall() is None:
+            return self._transact_call(args)
+        # the call is made immediately, but returns the same type as a queued call
+        future = Future()
+        try:
+            future.set_result(self._transact_call(args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _transact_call(self, args):
         rpc._internal_snap()
         args, tx = _get_tx(self._owner, args)
         tx['gas_price'] = 0
@@ -391,6 +501,27 @@ class ContractCall(_ContractMethod):
             rpc._internal_revert()
 
 
+def decode_input(calldata):
+    '''Decodes calldata for a call to any contract in the active project, using
+    the project's selector registry.
+
+    Args:
+        calldata: Calldata as a hex string or bytes.
+
+    Returns: (method name, [decoded inputs])'''
+    calldata = HexBytes(calldata)
+    matches = build.get_selector(calldata[:4].hex())
+    if not matches:
+        raise ValueError(f"No method in the active project matches selector {calldata[:4].hex()}")
+    abi = matches[0][1]
+    return abi['name'], _decode_input(abi, calldata)
+
+
+def _decode_input(abi, calldata):
+    values = _get_decoder(abi['inputs'])(ContextFramesBytesIO(calldata[4:]))
+    return list(format_output({'name': abi['name'], 'outputs': abi['inputs']}, values))
+
+
 def _get_tx(owner, args):
     # seperate contract inputs from tx dict and set default tx values
     tx = {'from': owner, 'value': 0, 'gas': None, 'gasPrice': None}
@@ -407,10 +538,39 @@ def _get_tx(owner, args):
     return args, tx
 
 
-def _get_method_object(address, abi, name, owner):
+def _get_method_object(address, abi, name, owner, signature=None):
     if abi['stateMutability'] in ('view', 'pure'):
-        return ContractCall(address, abi, name, owner)
-    return ContractTx(address, abi, name, owner)
+        return ContractCall(address, abi, name, owner, signature)
+    return ContractTx(address, abi, name, owner, signature)
+
+
+def _get_method_table(name, abi):
+    # tables are cached by the identity of the ABI, which is shared between a
+    # ContractContainer and the Contract objects it creates. the cache is
+    # cleared when the project is closed
+    key = id(abi)
+    if key not in _method_tables or _method_tables[key][0] is not abi:
+        _method_tables[key] = (abi, _MethodTable(name, abi))
+    return _method_tables[key][1]
+
+
+def _get_encoder(inputs):
+    return _tuple_encoder(tuple(i['type'] for i in inputs))
+
+
+def _get_decoder(outputs):
+    return _tuple_decoder(tuple(i['type'] for i in outputs))
+
+
+@lru_cache(maxsize=None)
+def _tuple_encoder(types):
+    # same encoder that eth_abi.encode_abi builds on every call
+    return TupleEncoder(encoders=[registry.get_encoder(i) for i in types])
+
+
+@lru_cache(maxsize=None)
+def _tuple_decoder(types):
+    return TupleDecoder(decoders=[registry.get_decoder(i) for i in types])
 
 
 def _inputs(abi):
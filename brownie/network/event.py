@@ -1,13 +1,29 @@
 #!/usr/bin/python3
 
+import atexit
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from hashlib import sha1
 import json
 from pathlib import Path
 
-import eth_event
+from eth_abi import decode_abi, decode_single, encode_single
+from eth_abi.exceptions import DecodingError
+from eth_hash.auto import keccak
+from hexbytes import HexBytes
 
-from brownie.convert import format_event
+from .history import _ContractHistory
+from .web3 import Web3
+from brownie.convert import format_event, format_input
 from brownie._config import CONFIG
 
+_contracts = _ContractHistory()
+web3 = Web3()
+
+_LOG_OPS = ("LOG0", "LOG1", "LOG2", "LOG3", "LOG4")
+_QUERY_WORKERS = 4
+_QUERY_BLOCKS = 10000  # initial number of blocks requested by each eth_getLogs call
+
 
 class EventDict:
     '''Dict/list hybrid container, base class for all events fired in a transaction.'''
@@ -16,22 +32,21 @@ class EventDict:
         '''Instantiates the class.
 
         Args:
-            events: event data as supplied by eth_event.decode_logs or eth_event.decode_trace'''
-        self._ordered = [_EventItem(
-            i['name'],
-            [dict((x['name'], x['value']) for x in i['data'])],
-            (pos,)
-        ) for pos, i in enumerate(events)]
-        self._dict = {}
-        for event in self._ordered:
-            if event.name in self._dict:
-                continue
-            events = [i for i in self._ordered if i.name == event.name]
-            self._dict[event.name] = _EventItem(
-                event.name,
-                events,
-                tuple(i.pos[0] for i in events)
+            events: event data as supplied by decode_logs or decode_trace'''
+        self._ordered = []
+        grouped = {}
+        for pos, event in enumerate(events):
+            item = _EventItem(
+                event['name'],
+                [dict((x['name'], x['value']) for x in event['data'])],
+                (pos,)
             )
+            self._ordered.append(item)
+            grouped.setdefault(item.name, []).append(item)
+        self._dict = dict((
+            name,
+            _EventItem(name, items, tuple(i.pos[0] for i in items))
+        ) for name, items in grouped.items())
 
     def __repr__(self):
         return str(self)
@@ -41,7 +56,7 @@ class EventDict:
 
     def __contains__(self, name):
         '''returns True if an event fired with the given name.'''
-        return name in [i.name for i in self._ordered]
+        return name in self._dict
 
     def __getitem__(self, key):
         '''if key is int: returns the n'th event that was fired
@@ -62,7 +77,9 @@ class EventDict:
 
     def count(self, name):
         '''EventDict.count(name) -> integer -- return number of occurrences of name'''
-        return len([i.name for i in self._ordered if i.name == name])
+        if name not in self._dict:
+            return 0
+        return len(self._dict[name])
 
     def items(self):
         '''EventDict.items() -> a set-like object providing a view on EventDict's items'''
@@ -133,38 +150,434 @@ class _EventItem:
         return self._ordered[0].values()
 
 
+class _EventDecoder:
+
+    '''Decodes logs for a single event topic. The event ABI is parsed once, when
+    the decoder is created.'''
+
+    __slots__ = ('name', 'inputs', 'types', 'indexed')
+
+    def __init__(self, abi):
+        self.name = abi['name']
+        self.inputs = [(i['name'], i['type'], i['indexed']) for i in abi['inputs']]
+        self.types = [i['type'] for i in abi['inputs'] if not i['indexed']]
+        self.indexed = len(self.inputs) - len(self.types)
+
+    def decode(self, topics, data):
+        '''Decodes a single event.
+
+        Args:
+            topics: List of indexed topics, not including the event topic.
+            data: Unindexed event data as hex string or bytes.
+
+        Returns: Dict of {'name': event name, 'data': [decoded values]}
+
+        Raises DecodingError if the log does not match the event ABI.'''
+        if len(topics) != self.indexed:
+            raise DecodingError(f"Incorrect number of topics for event '{self.name}'")
+        data = HexBytes(data)
+        if self.types and not data:
+            raise DecodingError(f"No data for event '{self.name}'")
+        try:
+            values = iter(decode_abi(self.types, data))
+        except OverflowError:
+            raise DecodingError(f"Cannot decode data for event '{self.name}'") from None
+        topics = iter(topics)
+        result = []
+        for name, type_, indexed in self.inputs:
+            decoded = True
+            if indexed:
+                value = HexBytes(next(topics))
+                try:
+                    value = decode_single(type_, value)
+                except (DecodingError, OverflowError):
+                    # dynamic types are stored as a hash, they cannot be decoded
+                    value = value.hex()
+                    decoded = False
+            else:
+                value = next(values)
+                if type_ == "string" and type(value) is bytes:
+                    value = value.decode('utf-8')
+            if type(value) is bytes:
+                value = "0x" + value.hex()
+            elif type(value) is HexBytes:
+                value = value.hex()
+            result.append({'name': name, 'type': type_, 'value': value, 'decoded': decoded})
+        return {'name': self.name, 'data': result}
+
+
+class _EventLog(_EventItem):
+
+    '''A single event returned by a historical event query.
+
+    Attributes:
+        name: event name
+        address: address of the contract that emitted the event
+        block_number: block number that the event was emitted in
+        txid: hash of the transaction that emitted the event
+        log_index: position of the event within the block'''
+
+    def __init__(self, log, decoder):
+        event = format_event(_decode(log['topics'], log['data'], decoder))
+        super().__init__(
+            event['name'],
+            [dict((x['name'], x['value']) for x in event['data'])],
+            (log['logIndex'],)
+        )
+        self.address = log['address']
+        self.block_number = log['blockNumber']
+        self.txid = log['transactionHash']
+        self.log_index = log['logIndex']
+
+
+class ContractEvents:
+
+    '''Historical events for a ContractContainer or Contract. Each event in the
+    ABI is available as a ContractEvent attribute, created when first accessed.'''
+
+    def __init__(self, parent):
+        self._parent = parent
+
+    def __dir__(self):
+        return list(self._parent.topics)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._parent.topics:
+            raise AttributeError(f"'{self._parent._name}' has no event '{name}'")
+        event = ContractEvent(self._parent, name, self._parent.topics[name])
+        setattr(self, name, event)
+        return event
+
+    def __repr__(self):
+        return f"<ContractEvents object '{self._parent._name}'>"
+
+
+class ContractEvent:
+
+    '''Queries the logs for a single contract event.
+
+    When the parent is a ContractContainer, the logs of every deployment in the
+    container are included in the query.
+
+    Attributes:
+        abi: Event ABI.
+        topic: Bytes32 event topic.'''
+
+    _dir_color = "contract_method"
+
+    def __init__(self, parent, name, topic):
+        self._parent = parent
+        self._name = f"{parent._name}.{name}"
+        self.topic = topic
+        self.abi = next(
+            i for i in parent.abi if i['type'] == "event" and i['name'] == name and
+            get_topics([i])[name] == topic
+        )
+        self._decoder = _EventDecoder(self.abi)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} object '{self._name}'>"
+
+    def get(self, from_block=0, to_block=None, filters=None):
+        '''Yields every occurrence of this event within a range of blocks.
+
+        The range is split into chunks that are requested concurrently. If a
+        request fails, its chunk is halved and the following chunks are made
+        smaller. Results are cached in the project build folder, so a repeated
+        query only requests blocks that were not included in the last one.
+
+        Args:
+            from_block: First block to include.
+            to_block: Last block to include. If None, the query ends at the
+                      latest block.
+            filters: Dict of {'indexed input name': value}. If a list of values
+                     is given, events matching any of them are included.
+
+        Yields: _EventLog objects, in the order the events were emitted.'''
+        if to_block is None:
+            to_block = web3.eth.blockNumber
+        topics = [self.topic] + self._filter_topics(filters or {})
+        if hasattr(self._parent, 'address'):
+            addresses = [self._parent.address]
+        else:
+            addresses = [i.address for i in _contracts.list(self._parent._name)]
+        if not addresses or from_block > to_block:
+            return
+        query = _LogQuery(addresses, topics)
+        for log in query.get(from_block, to_block):
+            yield _EventLog(log, self._decoder)
+
+    def _filter_topics(self, filters):
+        indexed = [i for i in self.abi['inputs'] if i['indexed']]
+        names = [i['name'] for i in indexed]
+        for key in filters:
+            if key not in names:
+                raise KeyError(f"'{key}' is not an indexed input of {self._name}")
+        topics = []
+        for abi in indexed:
+            if abi['name'] not in filters:
+                topics.append(None)
+                continue
+            values = filters[abi['name']]
+            if type(values) not in (list, tuple):
+                values = [values]
+            encoded = [_encode_topic(abi, i) for i in values]
+            topics.append(encoded[0] if len(encoded) == 1 else encoded)
+        while topics and topics[-1] is None:
+            topics.pop()
+        return topics
+
+
+class _LogQuery:
+
+    '''A single eth_getLogs query, split into chunks of blocks.
+
+    Logs are cached in build/events/<network>/ of the active project, except
+    on networks that use a local test RPC where the chain is frequently reset.'''
+
+    def __init__(self, addresses, topics):
+        self._params = {'address': addresses, 'topics': topics}
+        self._blocks = _QUERY_BLOCKS
+        self._path = None
+        self._start = None
+        self._end = None
+        self._logs = []
+        network = CONFIG['active_network']
+        if not CONFIG['folders']['project'] or not network['name'] or 'test-rpc' in network:
+            return
+        key = sha1(json.dumps([sorted(addresses), topics]).encode()).hexdigest()
+        self._path = Path(CONFIG['folders']['project']).joinpath(
+            f"build/events/{network['name']}/{key}.json"
+        )
+        try:
+            with self._path.open() as fp:
+                cache = json.load(fp)
+            self._start, self._end, self._logs = cache['start'], cache['end'], cache['logs']
+        except (FileNotFoundError, json.decoder.JSONDecodeError, KeyError):
+            pass
+
+    def get(self, start, end):
+        '''Yields raw logs between two blocks, using the cache where possible.'''
+        if self._start is None or start > self._end + 1 or end < self._start - 1:
+            segments = [(start, end)]
+        else:
+            segments = []
+            if start < self._start:
+                segments.append((start, self._start - 1))
+            segments.append([
+                i for i in self._logs
+                if max(start, self._start) <= i['blockNumber'] <= min(end, self._end)
+            ])
+            if end > self._end:
+                segments.append((self._end + 1, end))
+        logs = []
+        for log in self._stream(segments):
+            logs.append(log)
+            yield log
+        self._save(start, end, logs)
+
+    def _stream(self, segments):
+        # chunks are fetched concurrently, but yielded in order
+        tasks = iter(self._tasks(segments))
+        queue = deque()
+        executor = ThreadPoolExecutor(_QUERY_WORKERS)
+        try:
+            while True:
+                while len(queue) < _QUERY_WORKERS * 2:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    if type(task) is tuple:
+                        task = executor.submit(self._fetch, *task)
+                    queue.append(task)
+                if not queue:
+                    return
+                task = queue.popleft()
+                yield from task.result() if isinstance(task, Future) else task
+        finally:
+            for task in queue:
+                if isinstance(task, Future):
+                    task.cancel()
+            executor.shutdown(wait=False)
+
+    def _tasks(self, segments):
+        # the chunk size is read as each task is created, so it can shrink mid-query
+        for segment in segments:
+            if type(segment) is list:
+                yield segment
+                continue
+            start, end = segment
+            while start <= end:
+                stop = min(start + self._blocks - 1, end)
+                yield (start, stop)
+                start = stop + 1
+
+    def _fetch(self, start, end):
+        params = dict(self._params, fromBlock=start, toBlock=end)
+        try:
+            logs = web3.eth.getLogs(params)
+        except ValueError:
+            # the node may limit the size of a response, split the range and retry
+            if start == end:
+                raise
+            middle = (start + end) // 2
+            self._blocks = max(1, min(self._blocks, middle - start + 1))
+            return self._fetch(start, middle) + self._fetch(middle + 1, end)
+        return [{
+            'address': i['address'],
+            'blockNumber': i['blockNumber'],
+            'transactionHash': HexBytes(i['transactionHash']).hex(),
+            'logIndex': i['logIndex'],
+            'topics': [HexBytes(x).hex() for x in i['topics']],
+            'data': HexBytes(i['data']).hex()
+        } for i in logs]
+
+    def _save(self, start, end, logs):
+        if self._path is None:
+            return
+        if self._start is not None and start <= self._end + 1 and end >= self._start - 1:
+            logs = (
+                [i for i in self._logs if i['blockNumber'] < start] + logs +
+                [i for i in self._logs if i['blockNumber'] > end]
+            )
+            start, end = min(start, self._start), max(end, self._end)
+        self._start, self._end, self._logs = start, end, logs
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open('w') as fp:
+            json.dump({'start': start, 'end': end, 'logs': logs}, fp)
+
+
 def _get_path():
     return Path(CONFIG['folders']['brownie']).joinpath('data/topics.json')
 
 
 def get_topics(abi):
-    new_topics = _topics.copy()
-    new_topics.update(eth_event.get_event_abi(abi))
-    if new_topics != _topics:
-        _topics.update(new_topics)
-        with _get_path().open('w') as fp:
-            json.dump(new_topics, fp, sort_keys=True, indent=2)
-    return eth_event.get_topics(abi)
+    '''Adds the events in an ABI to the topic registry.
+
+    Topics are only written to disk when the registry is saved, which happens
+    after a project is loaded and when brownie exits.
+
+    Args:
+        abi: Contract ABI
+
+    Returns: Dict of {'event name': "bytes32 topic"}'''
+    global _dirty
+    topics = {}
+    for event in [i for i in abi if i['type'] == "event" and not i['anonymous']]:
+        signature = f"{event['name']}({','.join(i['type'] for i in event['inputs'])})"
+        if signature not in _signatures:
+            _signatures[signature] = "0x" + keccak(signature.encode()).hex()
+        topic = _signatures[signature]
+        value = {'name': event['name'], 'inputs': event['inputs']}
+        if _topics.get(topic) != value:
+            _topics[topic] = value
+            _decoders.pop(topic, None)
+            _dirty = True
+        topics[event['name']] = topic
+    return topics
+
+
+def _save_topics():
+    # writes the topic registry to disk, if it has changed since it was loaded
+    global _dirty
+    if not _dirty:
+        return
+    with _get_path().open('w') as fp:
+        json.dump(_topics, fp, sort_keys=True)
+    _dirty = False
+
+
+def _decode(topics, data, decoder=None):
+    topic = HexBytes(topics[0]).hex() if topics else None
+    if decoder is None and topic in _topics:
+        if topic not in _decoders:
+            _decoders[topic] = _EventDecoder(_topics[topic])
+        decoder = _decoders[topic]
+    if decoder is not None:
+        try:
+            return decoder.decode(topics[1:], data)
+        except DecodingError:
+            # the topic matches an event with a different ABI, e.g. where the
+            # same signature has different indexed inputs
+            pass
+    return {
+        'name': "(unknown)",
+        'data': [
+            {'name': "topics", 'type': "bytes32[]", 'value': topics, 'decoded': True},
+            {'name': "data", 'type': "bytes", 'value': data, 'decoded': True}
+        ]
+    }
 
 
 def decode_logs(logs):
+    '''Decodes the events in a transaction receipt.
+
+    Args:
+        logs: Log list from a transaction receipt.
+
+    Returns: EventDict of decoded events. Events with an unknown topic are
+             named "(unknown)" and contain the raw topics and data.'''
     if not logs:
         return []
-    events = eth_event.decode_logs(logs, _topics)
+    events = [
+        _decode([HexBytes(x).hex() for x in i['topics']], HexBytes(i['data']).hex())
+        for i in logs
+    ]
     events = [format_event(i) for i in events]
     return EventDict(events)
 
 
 def decode_trace(trace):
+    '''Decodes the events in a transaction trace. Used for transactions that
+    reverted, where the receipt contains no logs.
+
+    Args:
+        trace: Trace object or structLog list from debug_traceTransaction
+
+    Returns: EventDict of decoded events.'''
     if not trace:
         return []
-    events = eth_event.decode_trace(trace, _topics)
+    if hasattr(trace, 'find_op'):
+        steps = []
+        idx = trace.find_op(_LOG_OPS)
+        while idx != -1:
+            steps.append(trace[idx])
+            idx = trace.find_op(_LOG_OPS, idx + 1)
+    else:
+        steps = [i for i in trace if i['op'] in _LOG_OPS]
+    events = []
+    for step in steps:
+        stack = step['stack']
+        offset = int(stack[-1], 16) * 2
+        length = int(stack[-2], 16) * 2
+        count = int(step['op'][3])
+        topics = ["0x" + stack[-3 - i] for i in range(count)]
+        data = "0x" + "".join(step['memory'])[offset:offset+length]
+        events.append(_decode(topics, data))
     events = [format_event(i) for i in events]
     return EventDict(events)
 
 
+def _encode_topic(abi, value):
+    # encodes a value as an indexed event topic, dynamic types are stored as a hash
+    value = format_input({'name': abi['name'], 'inputs': [abi]}, [value])[0]
+    if abi['type'] == "string":
+        return "0x" + keccak(value.encode()).hex()
+    if abi['type'] == "bytes":
+        return "0x" + keccak(HexBytes(value)).hex()
+    if abi['type'].endswith("]") or abi['type'].startswith("tuple"):
+        raise TypeError(f"Cannot filter by indexed input '{abi['name']}' of type {abi['type']}")
+    return "0x" + encode_single(abi['type'], value).hex()
+
+
+_signatures = {}
+_decoders = {}
+_dirty = False
+
 try:
     with _get_path().open() as fp:
         _topics = json.load(fp)
 except (FileNotFoundError, json.decoder.JSONDecodeError):
     _topics = {}
+
+atexit.register(_save_topics)
@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
-from collections import OrderedDict
+from bisect import bisect_left, insort
+from itertools import count
+import math
 
 from .rpc import Rpc
 from .web3 import Web3
@@ -10,15 +12,30 @@ from brownie._singleton import _Singleton
 
 web3 = Web3()
 
+_INDEXED = ('sender', 'receiver', 'contract_name', 'fn_name')
+_GAS_KEYS = ('avg', 'count', 'high', 'low', 'median', 'p90', 'p99', 'stddev')
+_GAMMA = 1.01
+_LOG_GAMMA = math.log(_GAMMA)
+
 
 class TxHistory(metaclass=_Singleton):
 
     '''List-like singleton container that contains TransactionReceipt objects.
     Whenever a transaction is broadcast, the TransactionReceipt is automatically
-    added to this container.'''
+    added to this container.
+
+    Confirmed transactions are indexed by sender, receiver, contract name and
+    function name, and are kept sorted by block number so they can be removed
+    quickly when the chain is reverted. The sequence number of each transaction
+    is its position in the list.'''
 
     def __init__(self):
         self._list = []
+        self._seq = {}
+        self._count = count()
+        self._pending = set()
+        self._blocks = []
+        self._index = dict((i, {}) for i in _INDEXED)
         self.gas_profile = {}
         Rpc()._objects.append(self)
 
@@ -29,7 +46,10 @@ class TxHistory(metaclass=_Singleton):
         return bool(self._list)
 
     def __contains__(self, item):
-        return item in self._list
+        try:
+            return item in self._seq
+        except TypeError:
+            return False
 
     def __iter__(self):
         return iter(self._list)
@@ -41,93 +61,324 @@ class TxHistory(metaclass=_Singleton):
         return len(self._list)
 
     def _reset(self):
-        self._list.clear()
+        self.clear()
 
     def _revert(self):
         height = web3.eth.blockNumber
-        self._list = [i for i in self._list if i.block_number <= height]
+        idx = bisect_left(self._blocks, (height + 1,))
+        removed = set(i[2] for i in self._blocks[idx:])
+        if not removed:
+            return
+        del self._blocks[idx:]
+        # reverted transactions are at the end of the list, only the items after
+        # the earliest of them are examined
+        start = min(self._seq[tx] for tx in removed)
+        kept = [i for i in self._list[start:] if i not in removed]
+        del self._list[start:]
+        for tx in removed:
+            del self._seq[tx]
+            for name, index in self._index.items():
+                del index[_key(name, getattr(tx, name))][tx]
+        self._count = count(start)
+        for tx in kept:
+            seq = self._seq[tx]
+            self._seq[tx] = next(self._count)
+            self._list.append(tx)
+            if tx not in self._pending:
+                i = bisect_left(self._blocks, (tx.block_number, seq))
+                self._blocks[i] = (tx.block_number, self._seq[tx], tx)
 
     def _add_tx(self, tx):
+        self._seq[tx] = next(self._count)
+        self._pending.add(tx)
         self._list.append(tx)
 
+    def _confirm_tx(self, tx):
+        # called when a transaction confirms and the indexed attributes are known
+        if tx not in self._pending:
+            return
+        self._pending.remove(tx)
+        insort(self._blocks, (tx.block_number, self._seq[tx], tx))
+        for name, index in self._index.items():
+            index.setdefault(_key(name, getattr(tx, name)), {})[tx] = None
+
     def clear(self):
         self._list.clear()
+        self._seq.clear()
+        self._count = count()
+        self._pending.clear()
+        self._blocks.clear()
+        for index in self._index.values():
+            index.clear()
 
     def copy(self):
         '''Returns a shallow copy of the object as a list'''
         return self._list.copy()
 
+    def filter(self, key=None, **kwargs):
+        '''Returns a list of transactions that match the given criteria.
+
+        Args:
+            key: Optional callable, transactions are only included if it returns True.
+            **kwargs: Attribute values that each transaction must match. Queries on
+                      sender, receiver, contract_name and fn_name use an index.
+
+        Returns: List of TransactionReceipt objects, in the order they were broadcast.'''
+        indexed = [(k, _key(k, v)) for k, v in kwargs.items() if k in self._index]
+        if indexed:
+            candidates = min((self._index[k].get(v, {}) for k, v in indexed), key=len)
+            candidates = self._sort(set(candidates).union(self._pending))
+        else:
+            candidates = self._list
+        return [
+            i for i in candidates if (key is None or key(i)) and
+            all(_match(k, getattr(i, k), v) for k, v in kwargs.items())
+        ]
+
     def from_sender(self, account):
         '''Returns a list of transactions where the sender is account'''
-        return [i for i in self._list if i.sender == account]
+        return self.filter(sender=account)
 
     def to_receiver(self, account):
         '''Returns a list of transactions where the receiver is account'''
-        return [i for i in self._list if i.receiver == account]
+        return self.filter(receiver=account)
 
     def of_address(self, account):
         '''Returns a list of transactions where account is the sender or receiver'''
-        return [i for i in self._list if i.receiver == account or i.sender == account]
+        return self._sort(set(self.from_sender(account) + self.to_receiver(account)))
+
+    def _sort(self, transactions):
+        return sorted(transactions, key=self._seq.__getitem__)
 
     def _gas(self, fn_name, gas_used):
         if fn_name not in self.gas_profile:
-            self.gas_profile[fn_name] = {
-                'avg': gas_used,
-                'high': gas_used,
-                'low': gas_used,
-                'count': 1
-            }
+            self.gas_profile[fn_name] = GasStats()
+        self.gas_profile[fn_name].add(gas_used)
+
+
+class GasStats:
+
+    '''Streaming gas usage statistics for a single contract function.
+
+    The count, total, high, low, mean and variance are tracked exactly. Samples
+    are also counted in a histogram with logarithmically sized bins, from which
+    percentiles are estimated to within 0.5% of the true value. Instances can be
+    merged and serialized, so results from different runs can be combined.
+
+    Values can be read as attributes or keys: avg, count, high, low, median,
+    p90, p99 and stddev.'''
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.high = None
+        self.low = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._bins = {}
+
+    def __repr__(self):
+        return repr(self.summary())
+
+    def __getitem__(self, key):
+        if key not in _GAS_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in _GAS_KEYS
+
+    def __len__(self):
+        return len(_GAS_KEYS)
+
+    def __iter__(self):
+        return iter(_GAS_KEYS)
+
+    def keys(self):
+        return self.summary().keys()
+
+    def items(self):
+        return self.summary().items()
+
+    def values(self):
+        return self.summary().values()
+
+    def add(self, gas_used):
+        '''Adds a single sample.'''
+        self.count += 1
+        self.total += gas_used
+        self.high = gas_used if self.high is None else max(self.high, gas_used)
+        self.low = gas_used if self.low is None else min(self.low, gas_used)
+        delta = gas_used - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (gas_used - self._mean)
+        key = _bin(gas_used)
+        self._bins[key] = self._bins.get(key, 0) + 1
+
+    def merge(self, other):
+        '''Adds all the samples from another GasStats object to this one.'''
+        if not other.count:
             return
-        gas = self.gas_profile[fn_name]
-        gas.update({
-            'avg': (gas['avg']*gas['count'] + gas_used) // (gas['count']+1),
-            'high': max(gas['high'], gas_used),
-            'low': min(gas['low'], gas_used)
-        })
-        gas['count'] += 1
+        if not self.count:
+            self._mean, self._m2 = other._mean, other._m2
+        else:
+            count = self.count + other.count
+            delta = other._mean - self._mean
+            self._m2 += other._m2 + delta**2 * self.count * other.count / count
+            self._mean += delta * other.count / count
+        self.count += other.count
+        self.total += other.total
+        self.high = other.high if self.high is None else max(self.high, other.high)
+        self.low = other.low if self.low is None else min(self.low, other.low)
+        for key, value in other._bins.items():
+            self._bins[key] = self._bins.get(key, 0) + value
+
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else 0
+
+    @property
+    def stddev(self):
+        return (self._m2 / self.count) ** 0.5 if self.count else 0
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+    @property
+    def p90(self):
+        return self.percentile(90)
+
+    @property
+    def p99(self):
+        return self.percentile(99)
+
+    def percentile(self, pct):
+        '''Returns an estimate of the given percentile, from 0 to 100.'''
+        if not self.count:
+            return None
+        rank = pct / 100 * (self.count - 1)
+        total = 0
+        for key in sorted(self._bins):
+            total += self._bins[key]
+            if total > rank:
+                break
+        return min(max(_bin_value(key), self.low), self.high)
+
+    def summary(self):
+        '''Returns a dict of the statistics.'''
+        return dict((i, getattr(self, i)) for i in _GAS_KEYS)
+
+    def to_dict(self):
+        '''Returns a json-serializable dict from which the object can be recreated.'''
+        return {
+            'count': self.count,
+            'total': self.total,
+            'high': self.high,
+            'low': self.low,
+            'mean': self._mean,
+            'm2': self._m2,
+            'bins': dict((str(k), v) for k, v in self._bins.items())
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        '''Creates a GasStats object from the output of GasStats.to_dict'''
+        stats = cls()
+        for key in ('count', 'total', 'high', 'low'):
+            setattr(stats, key, data[key])
+        stats._mean = data['mean']
+        stats._m2 = data['m2']
+        stats._bins = dict((int(k), v) for k, v in data['bins'].items())
+        return stats
 
 
 class _ContractHistory(metaclass=_Singleton):
 
-    '''Internal singleton dict of OrderedDicts that acts as a single container
-    for ContractContainer lists.'''
+    '''Internal singleton that acts as a single container for ContractContainer
+    lists.
+
+    Contracts are indexed by address, and kept in a list for each contract name
+    in the order they were added.'''
 
     def __init__(self):
         self._dict = {}
+        self._address = {}
         Rpc()._objects.append(self)
 
     def _reset(self):
         self._dict.clear()
+        self._address.clear()
 
     def _revert(self):
         height = web3.eth.blockNumber
-        for name, contracts in self._dict.items():
-            for contract in list(contracts.values()):
-                if contract.tx and contract.tx.block_number <= height:
-                    continue
-                elif len(web3.eth.getCode(contract.address).hex()) > 4:
-                    continue
-                del self._dict[name][contract.address]
+        contracts = [
+            x for x in self._address.values()
+            if not x.tx or x.tx.block_number > height
+        ]
+        with web3.batch() as batch:
+            code = [batch.request("eth_getCode", [i.address, "latest"]) for i in contracts]
+        for contract, result in zip(contracts, code):
+            if len(result.result().hex()) <= 4:
+                self.remove(contract)
 
     def add(self, contract):
-        name = contract._name
-        self._dict.setdefault(name, OrderedDict())[contract.address] = contract
+        self._dict.setdefault(contract._name, []).append(contract)
+        self._address[contract.address] = contract
 
     def remove(self, contract):
-        name = contract._name
-        del self._dict[name][contract.address]
+        # removed by identity, comparing Contract objects queries their bytecode
+        contracts = self._dict[contract._name]
+        del contracts[next(i for i, x in enumerate(contracts) if x is contract)]
+        del self._address[contract.address]
 
     def list(self, name):
-        self._dict.setdefault(name, OrderedDict())
-        return list(self._dict[name].values())
+        '''Returns the list of contracts with the given name. The list is the one
+        held by this object and must not be modified.'''
+        return self._dict.setdefault(name, [])
 
     def find(self, address):
-        address = to_address(address)
-        contracts = [x for v in self._dict.values() for x in v.values()]
-        return next((i for i in contracts if i == address), None)
+        if address in self._address:
+            return self._address[address]
+        try:
+            address = to_address(address)
+        except ValueError:
+            return None
+        return self._address.get(address)
 
     def dependencies(self):
         dependencies = set(k for k, v in self._dict.items() if v)
         for i in dependencies.copy():
-            dependencies.update(list(self._dict[i].values())[0]._build['dependencies'])
+            dependencies.update(self._dict[i][0]._build['dependencies'])
         return sorted(dependencies)
+
+
+def _bin(value):
+    # index of the histogram bin for a value, each bin is 1% wider than the last
+    if value <= 0:
+        return 0
+    return 1 + math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def _bin_value(key):
+    # midpoint of a histogram bin
+    if key == 0:
+        return 0
+    return round(2 * _GAMMA ** (key - 1) / (_GAMMA + 1))
+
+
+def _key(name, value):
+    # sender and receiver are indexed by address, so that accounts, contracts and
+    # address strings are all equivalent
+    if name in {'sender', 'receiver'} and value is not None:
+        try:
+            return to_address(str(value))
+        except ValueError:
+            pass
+    return value
+
+
+def _match(name, value, expected):
+    if name in _INDEXED:
+        return _key(name, value) == _key(name, expected)
+    return value == expected
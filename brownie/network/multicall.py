@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+
+from concurrent.futures import Future
+import threading
+
+import eth_abi
+from hexbytes import HexBytes
+
+from .web3 import Web3
+from brownie.convert import to_address
+from brownie.exceptions import VirtualMachineError
+
+web3 = Web3()
+
+_local = threading.local()
+
+# aggregate((address,bytes)[])
+AGGREGATE_SIGNATURE = "0x252dba42"
+
+AGGREGATOR_SOURCE = '''pragma solidity ^0.5.0;
+pragma experimental ABIEncoderV2;
+
+contract Multicall {
+
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    function aggregate(Call[] memory calls)
+        public
+        returns (uint256 blockNumber, bytes[] memory returnData)
+    {
+        blockNumber = block.number;
+        returnData = new bytes[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory data) = calls[i].target.call(calls[i].callData);
+            require(success);
+            returnData[i] = data;
+        }
+    }
+}'''
+
+
+class Multicall:
+
+    '''Context manager that collects contract calls and sends them together.
+
+    While the context is active, calls made with ContractCall objects (and
+    ContractTx.call) in the same thread return a concurrent.futures.Future
+    instead of the result. The calls are sent when the context exits, or when
+    Multicall.flush is called, and each future is resolved with the value
+    decoded by the method's decode_abi.
+
+    If an aggregator address is given, the calls are made through a single
+    eth_call to its aggregate((address,bytes)[]) method. Otherwise they are
+    sent as a JSON-RPC batch of eth_call requests. If the aggregated call
+    reverts, the calls are resent as a batch so that only the failing calls
+    raise. Calls that set 'from' in their transaction dict are always sent
+    in the batch, as msg.sender within an aggregated call is the aggregator.
+
+    Args:
+        address: Optional address of a deployed aggregator contract.'''
+
+    def __init__(self, address=None):
+        self.address = to_address(str(address)) if address else None
+        self._queue = []
+
+    def __enter__(self):
+        if _active_multicall() is not None:
+            raise RuntimeError("A multicall is already active in this thread")
+        _local.multicall = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.multicall = None
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self):
+        return len(self._queue)
+
+    @classmethod
+    def deploy(cls, account):
+        '''Compiles and deploys an aggregator contract.
+
+        Args:
+            account: Account to deploy the contract from.
+
+        Returns: Contract instance of the aggregator.'''
+        from brownie.project import compile_source
+        container = compile_source(AGGREGATOR_SOURCE)[0]
+        return container.deploy({'from': account})
+
+    def flush(self):
+        '''Sends all queued calls and resolves their futures.'''
+        queue, self._queue = self._queue, []
+        if not queue:
+            return
+        if self.address is not None:
+            aggregated = [i for i in queue if i[3]]
+            queue = [i for i in queue if not i[3]]
+            if aggregated:
+                try:
+                    self._aggregate(aggregated)
+                except ValueError:
+                    # one of the calls reverted, send them individually to find out which
+                    queue += aggregated
+        if queue:
+            self._batch(queue)
+
+    def _add(self, method, tx, aggregate=True):
+        future = Future()
+        self._queue.append((method, tx, future, aggregate))
+        return future
+
+    def _aggregate(self, queue):
+        calls = [(i[1]['to'], HexBytes(i[1]['data'])) for i in queue]
+        data = AGGREGATE_SIGNATURE + eth_abi.encode_abi(['(address,bytes)[]'], [calls]).hex()
+        response = web3.eth.call({'to': self.address, 'data': data})
+        returned = eth_abi.decode_abi(['uint256', 'bytes[]'], HexBytes(response))[1]
+        for (method, _, future, _), data in zip(queue, returned):
+            _resolve(future, method, data)
+
+    def _batch(self, queue):
+        with web3.batch() as batch:
+            requests = [
+                batch.request("eth_call", [dict((k, v) for k, v in i[1].items() if v), "latest"])
+                for i in queue
+            ]
+        for (method, _, future, _), request in zip(queue, requests):
+            try:
+                data = request.result()
+            except ValueError as e:
+                future.set_exception(VirtualMachineError(e))
+                continue
+            _resolve(future, method, data)
+
+
+def multicall(address=None):
+    '''Returns a Multicall context manager.
+
+    Args:
+        address: Optional address of a deployed aggregator contract. If not
+                 given, calls are sent as a JSON-RPC batch.'''
+    return Multicall(address)
+
+
+def _active_multicall():
+    return getattr(_local, 'multicall', None)
+
+
+def _resolve(future, method, data):
+    try:
+        future.set_result(method.decode_abi(data))
+    except Exception as e:
+        future.set_exception(e)
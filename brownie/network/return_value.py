@@ -1,21 +1,23 @@
 #!/usr/bin/python3
 
-from copy import deepcopy
+from functools import lru_cache
 
 from brownie.convert import EthAddress, HexString, Wei
 
+_DIRECT = {bool, int, Wei, EthAddress, HexString}
+
 
 class ReturnValue:
-    '''Tuple/dict hybrid container, used for return values on callable functions'''
+    '''Tuple/dict hybrid container, used for return values on callable functions
+
+    Instances only hold their values and a layout of the output names. Layouts
+    are shared between all return values with the same output names.'''
+
+    __slots__ = ('_tuple', '_layout')
 
     def __init__(self, values, abi):
         self._tuple = tuple(values)
-        self._abi = abi
-        self._dict = {}
-        for c, i in enumerate(abi['outputs']):
-            if not i['name']:
-                continue
-            self._dict[i['name']] = values[c]
+        self._layout = _get_layout(abi)
 
     def __repr__(self):
         return repr(self._tuple)
@@ -28,12 +30,10 @@ class ReturnValue:
 
     def __getitem__(self, key):
         if type(key) is slice:
-            abi = deepcopy(self._abi)
-            abi['outputs'] = abi['outputs'][key]
-            return ReturnValue(self._tuple[key], abi)
+            return _from_layout(self._tuple[key], _names_layout(self._layout[0][key]))
         if type(key) is int:
             return self._tuple[key]
-        return self._dict[key]
+        return self._tuple[self._layout[1][key]]
 
     def __contains__(self, value):
         return self.count(value) > 0
@@ -46,12 +46,12 @@ class ReturnValue:
 
     def copy(self):
         '''ReturnValue.copy() -> a shallow copy of ReturnValue'''
-        return ReturnValue(self._tuple, self._abi)
+        return _from_layout(self._tuple, self._layout)
 
     def count(self, value):
         '''ReturnValue.count(value) -> integer -- return number of occurrences of value'''
         count = 0
-        for item in self:
+        for item in self._tuple:
             try:
                 if _kwargtuple_compare(item, value):
                     count += 1
@@ -61,7 +61,7 @@ class ReturnValue:
 
     def dict(self):
         '''ReturnValue.dict() -> a dictionary of ReturnValue's named items'''
-        return self._dict
+        return dict((k, self._tuple[v]) for k, v in self._layout[1].items())
 
     def index(self, value, start=0, stop=None):
         '''ReturnValue.index(value, [start, [stop]]) -> integer -- return first index of value.
@@ -78,14 +78,40 @@ class ReturnValue:
 
     def items(self):
         '''ReturnValue.items() -> a set-like object providing a view on ReturnValue's named items'''
-        return self._dict.items()
+        return self.dict().items()
 
     def keys(self):
         '''ReturnValue.keys() -> a set-like object providing a view on ReturnValue's keys'''
-        return self._dict.keys()
+        return self._layout[1].keys()
+
+
+def _from_layout(values, layout):
+    # creates a ReturnValue without looking up the layout
+    value = ReturnValue.__new__(ReturnValue)
+    value._tuple = values
+    value._layout = layout
+    return value
+
+
+def _get_layout(abi):
+    # layouts are cached by the output names, so they are shared between ABIs
+    return _names_layout(tuple(i['name'] for i in abi['outputs']))
+
+
+@lru_cache(maxsize=1024)
+def _names_layout(names):
+    # (names, {name: index}), unnamed outputs are not included in the dict
+    index = {}
+    for i, name in enumerate(names):
+        if name:
+            index[name] = i
+    return names, index
 
 
 def _kwargtuple_compare(a, b):
+    if type(a) is type(b) and type(a) in _DIRECT:
+        # no conversion is needed between values of the same type
+        return a == b
     if type(a) not in (tuple, list, ReturnValue):
         types_ = set([type(a), type(b)])
         if types_.intersection([bool, type(None)]):
@@ -95,7 +121,7 @@ def _kwargtuple_compare(a, b):
         return _convert_str(a) == _convert_str(b)
     if type(b) not in (tuple, list, ReturnValue) or len(b) != len(a):
         return False
-    return next((False for i in range(len(a)) if not _kwargtuple_compare(a[i], b[i])), True)
+    return all(_kwargtuple_compare(x, y) for x, y in zip(a, b))
 
 
 def _convert_str(value):
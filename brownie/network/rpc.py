@@ -6,6 +6,7 @@ from subprocess import DEVNULL, PIPE
 import sys
 import time
 
+from .cache import ReadCache
 from .web3 import Web3
 
 from brownie._singleton import _Singleton
@@ -17,6 +18,7 @@ from brownie.exceptions import (
 
 
 web3 = Web3()
+cache = ReadCache()
 
 
 class Rpc(metaclass=_Singleton):
@@ -140,6 +142,9 @@ class Rpc(metaclass=_Singleton):
     def _request(self, *args):
         if not self.is_active():
             raise SystemError("RPC is not active.")
+        if args[0] != "evm_snapshot":
+            # requests to the test RPC bypass the web3 middlewares
+            cache.clear()
         try:
             response = web3.providers[0].make_request(*args)
             if 'result' in response:
@@ -165,6 +170,7 @@ class Rpc(metaclass=_Singleton):
         return id_
 
     def _reset(self):
+        cache.clear()
         for i in self._objects:
             i._reset()
 
@@ -0,0 +1,720 @@
+#!/usr/bin/python3
+
+from array import array
+from bisect import bisect_right
+import codecs
+import json
+import mmap
+from pathlib import Path
+import re
+
+import requests
+from web3 import HTTPProvider
+
+from .web3 import Web3
+from brownie.cli.utils import color
+from brownie.exceptions import RPCRequestError
+from brownie.project import build
+from brownie._config import CONFIG
+from brownie._singleton import _Singleton
+
+web3 = Web3()
+
+# opcodes where the stack and memory are required when evaluating a trace
+DATA_OPS = {
+    'CALL', 'CALLCODE', 'DELEGATECALL', 'STATICCALL', 'CREATE', 'CREATE2',
+    'LOG0', 'LOG1', 'LOG2', 'LOG3', 'LOG4', 'RETURN', 'REVERT'
+}
+
+_CHUNK_SIZE = 65536
+_STORE_SIZE = 2**28  # maximum size of build/traces.dat in bytes
+_TOKENS = re.compile('[{}"]')
+
+_BASE_KEYS = ('depth', 'gas', 'gasCost', 'op', 'pc')
+_STORED_COLUMNS = ('pc', 'op', 'depth', 'gas', 'gasCost')
+
+# amount of data retrieved at each step of a trace
+LEVEL_MINIMAL = 0  # no stack or memory
+LEVEL_DATA = 1  # stack and memory for DATA_OPS
+LEVEL_FULL = 2  # stack and memory for every step
+LEVEL_STORAGE = 3  # stack, memory and storage for every step
+_EXPANDED_KEYS = ('address', 'contractName', 'fn', 'jumpDepth', 'source')
+
+
+class Trace:
+
+    '''Compact, array-backed representation of a debug_traceTransaction trace.
+
+    Program counters, opcodes, depths and gas values are stored in typed arrays,
+    and contract, function and source names are interned. Indexing or iterating
+    returns TraceStep objects that behave like the original structLog dicts.
+
+    Attributes:
+        expanded: Boolean, have contract, function and source values been added?'''
+
+    def __init__(self, steps=()):
+        self._columns = {
+            'pc': array('L'),
+            'op': array('B'),
+            'depth': array('H'),
+            'gas': array('q'),
+            'gasCost': array('q'),
+            'jumpDepth': array('H')
+        }
+        self._location = array('L')
+        self._fn = array('L')
+        self._source = array('l')
+        self._interned = []
+        self._interned_ids = {}
+        self._ops = []
+        self._op_ids = {}
+        self._op_bytes = None
+        self._data = {}
+        self.expanded = False
+        self.minimal = False
+        for step in steps:
+            self.append(step)
+
+    def __len__(self):
+        return len(self._columns['pc'])
+
+    def __bool__(self):
+        return bool(self._columns['pc'])
+
+    def __getitem__(self, key):
+        if type(key) is slice:
+            return [TraceStep(self, i) for i in range(len(self))[key]]
+        length = len(self)
+        if key < -length or key >= length:
+            raise IndexError("trace index out of range")
+        return TraceStep(self, key % length)
+
+    def __iter__(self):
+        return (TraceStep(self, i) for i in range(len(self)))
+
+    def __repr__(self):
+        return f"<Trace object ({len(self)} steps)>"
+
+    def append(self, step):
+        '''Adds a structLog step to the end of the trace.'''
+        step = step.copy()
+        op = step.pop('op')
+        if op not in self._op_ids:
+            self._op_ids[op] = len(self._ops)
+            self._ops.append(op)
+        self._columns['op'].append(self._op_ids[op])
+        for key in ('pc', 'depth', 'gas', 'gasCost'):
+            self._columns[key].append(step.pop(key))
+        self._op_bytes = None
+        if step:
+            self._data[len(self)-1] = step
+
+    def column(self, key):
+        '''Returns the array of values for one numeric field across every step.
+
+        Args:
+            key: 'pc', 'depth', 'gas', 'gasCost' or 'jumpDepth'
+
+        Returns: array.array'''
+        if key not in self._columns or key == "op":
+            raise KeyError(f"'{key}' is not a numeric trace column")
+        return self._columns[key]
+
+    def find_op(self, ops, start=0, stop=None, reverse=False):
+        '''Finds a step by opcode.
+
+        Args:
+            ops: Sequence of opcode names to search for.
+            start: Index to begin the search at.
+            stop: Index to end the search at.
+            reverse: If True, returns the last match within the range.
+
+        Returns: Step index, or -1 if no match was found.'''
+        if self._op_bytes is None:
+            self._op_bytes = self._columns['op'].tobytes()
+        if stop is None:
+            stop = len(self)
+        fn = self._op_bytes.rfind if reverse else self._op_bytes.find
+        found = [fn(bytes([self._op_ids[i]]), start, stop) for i in ops if i in self._op_ids]
+        found = [i for i in found if i != -1]
+        if not found:
+            return -1
+        return max(found) if reverse else min(found)
+
+    def index(self, step):
+        '''Returns the index of a step within the trace.'''
+        if type(step) is TraceStep and step._trace is self:
+            return step._idx
+        try:
+            return next(i for i in range(len(self)) if self[i] == step)
+        except StopIteration:
+            raise ValueError(f"{step} is not in trace") from None
+
+    def _serialize(self):
+        # returns the unexpanded trace as a json-compatible header and a bytestring
+        header = {
+            'ops': self._ops,
+            'length': len(self),
+            'itemsize': dict((i, self._columns[i].itemsize) for i in _STORED_COLUMNS),
+            'data': self._data,
+            'minimal': self.minimal
+        }
+        return header, b"".join(self._columns[i].tobytes() for i in _STORED_COLUMNS)
+
+    @classmethod
+    def _deserialize(cls, header, body):
+        trace = cls()
+        if header['itemsize'] != dict((i, trace._columns[i].itemsize) for i in _STORED_COLUMNS):
+            raise ValueError("Stored trace was created on an incompatible platform")
+        position = 0
+        for key in _STORED_COLUMNS:
+            size = trace._columns[key].itemsize * header['length']
+            trace._columns[key].frombytes(body[position:position+size])
+            position += size
+        trace._ops = header['ops']
+        trace._op_ids = dict((v, k) for k, v in enumerate(trace._ops))
+        trace._data = dict((int(k), v) for k, v in header['data'].items())
+        trace.minimal = header['minimal']
+        return trace
+
+    def _add_location(self, address, contract_name, fn, jump_depth, path, offset):
+        # adds the expanded values for the next unexpanded step
+        self._location.append(self._intern((address, contract_name)))
+        self._fn.append(self._intern(fn))
+        self._columns['jumpDepth'].append(jump_depth)
+        self._source.append(-1 if path is None else self._intern((path, tuple(offset))))
+
+    def _set_data(self, idx, data):
+        # adds values to a step that was retrieved with a minimal trace
+        self._data.setdefault(idx, {}).update(data)
+
+    def _intern(self, value):
+        if value not in self._interned_ids:
+            self._interned_ids[value] = len(self._interned)
+            self._interned.append(value)
+        return self._interned_ids[value]
+
+    def _keys(self, idx):
+        keys = list(_BASE_KEYS)
+        if idx < len(self._fn):
+            keys += _EXPANDED_KEYS
+        if idx in self._data:
+            keys += self._data[idx]
+        return keys
+
+    def _get(self, idx, key):
+        if key == "op":
+            return self._ops[self._columns['op'][idx]]
+        if key in _BASE_KEYS:
+            return self._columns[key][idx]
+        if key in _EXPANDED_KEYS and idx < len(self._fn):
+            if key == "jumpDepth":
+                return self._columns['jumpDepth'][idx]
+            if key == "fn":
+                return self._interned[self._fn[idx]]
+            if key == "source":
+                if self._source[idx] == -1:
+                    return False
+                path, offset = self._interned[self._source[idx]]
+                return {'filename': path, 'offset': offset}
+            return self._interned[self._location[idx]][key == "contractName"]
+        if idx in self._data and key in self._data[idx]:
+            return self._data[idx][key]
+        raise KeyError(key)
+
+
+class TraceStep:
+
+    '''Dict-like view of a single step within a Trace.'''
+
+    __slots__ = ('_trace', '_idx')
+
+    def __init__(self, trace, idx):
+        self._trace = trace
+        self._idx = idx
+
+    def __getitem__(self, key):
+        return self._trace._get(self._idx, key)
+
+    def __contains__(self, key):
+        return key in self._trace._keys(self._idx)
+
+    def __iter__(self):
+        return iter(self._trace._keys(self._idx))
+
+    def __len__(self):
+        return len(self._trace._keys(self._idx))
+
+    def __eq__(self, other):
+        if type(other) is TraceStep:
+            return self._trace is other._trace and self._idx == other._idx
+        return dict(self.items()) == other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    @property
+    def index(self):
+        '''Index of this step within the trace.'''
+        return self._idx
+
+    def get(self, key, default=None):
+        '''TraceStep.get(key, [default]) -> value of key if present, else default'''
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        '''TraceStep.items() -> list of (key, value) pairs for this step'''
+        return [(i, self[i]) for i in self]
+
+    def keys(self):
+        '''TraceStep.keys() -> list of keys for this step'''
+        return self._trace._keys(self._idx)
+
+    def values(self):
+        '''TraceStep.values() -> list of values for this step'''
+        return [self[i] for i in self]
+
+
+class CallFrame:
+
+    '''A single function call within an expanded transaction trace. Frames form a
+    tree, the root of which is available at TransactionReceipt.call_tree.
+
+    Attributes:
+        start: Index of the first step in the frame.
+        end: Index after the last step in the frame.
+        depth: Number of external calls away from the initially called contract.
+        jump_depth: Number of internal jumps made within the active contract.
+        fn: Name of the function.
+        address: Address of the contract executing this function.
+        contract_name: Name of the contract executing this function.
+        gas_used: Gas consumed from the first to the last step of the frame.
+        reverted: Did the frame end with a REVERT or INVALID opcode?
+        parent: The calling CallFrame, or None.
+        children: List of CallFrames called from this frame.'''
+
+    def __init__(self, trace, start, parent=None):
+        self._trace = trace
+        self.start = start
+        self.end = len(trace)
+        self.depth = trace.column('depth')[start]
+        self.jump_depth = trace.column('jumpDepth')[start]
+        self.parent = parent
+        self.children = []
+        self._starts = []
+        if parent is not None:
+            parent.children.append(self)
+            parent._starts.append(start)
+
+    def __repr__(self):
+        return f"<CallFrame '{self.fn}' {self.start}:{self.end}>"
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def fn(self):
+        return self._trace[self.start]['fn']
+
+    @property
+    def address(self):
+        return self._trace[self.start]['address']
+
+    @property
+    def contract_name(self):
+        return self._trace[self.start]['contractName']
+
+    @property
+    def gas_used(self):
+        last = self._trace[self.end-1]
+        return self._trace[self.start]['gas'] - last['gas'] + last['gasCost']
+
+    @property
+    def reverted(self):
+        last = self._trace[self.end-1]
+        return (
+            last['op'] in {"REVERT", "INVALID"} and
+            last['depth'] == self.depth and
+            last['jumpDepth'] == self.jump_depth
+        )
+
+    def walk(self):
+        '''Yields this frame and every frame called from it, depth first.'''
+        stack = [self]
+        while stack:
+            frame = stack.pop()
+            yield frame
+            stack.extend(frame.children[::-1])
+
+    def filter(self, key=None, **kwargs):
+        '''Returns frames within this tree that match the given criteria.
+
+        Args:
+            key: Optional callable, frames are only included if it returns True.
+            **kwargs: Attribute values that each frame must match.
+
+        Returns: List of CallFrame objects, in the order they were called.'''
+        return [
+            i for i in self.walk() if (key is None or key(i)) and
+            all(getattr(i, k) == v for k, v in kwargs.items())
+        ]
+
+    def find(self, idx):
+        '''Returns the innermost frame containing the given trace step index.'''
+        if not self.start <= idx < self.end:
+            raise IndexError(f"Step {idx} is not within this frame")
+        frame = self
+        while True:
+            i = bisect_right(frame._starts, idx) - 1
+            if i < 0 or frame.children[i].end <= idx:
+                return frame
+            frame = frame.children[i]
+
+    def render(self):
+        '''Returns a string representation of this frame and every frame called from
+        it, in the format displayed by TransactionReceipt.call_trace'''
+        result = [self._render_line(None)]
+        stack = [(i, "", i is self.children[-1]) for i in self.children[::-1]]
+        while stack:
+            frame, prefix, last = stack.pop()
+            result.append(frame._render_line(prefix + ("\u2514" if last else "\u251c")))
+            prefix += "  " if last else "\u2502 "
+            stack.extend((i, prefix, i is frame.children[-1]) for i in frame.children[::-1])
+        return "\n".join(result)
+
+    def _render_line(self, indent):
+        line = f"{color['dull']}"
+        if indent is not None:
+            line += f"{indent}\u2500"
+        if self.reverted:
+            line += color("error")
+        else:
+            line += color("contract_method" if not self.jump_depth else "")
+        line += f"{self.fn} {color['dull']}{self.start}:{self.end}{color}"
+        if not self.jump_depth:
+            line += f"  {color['dull']}({color}{self.address}{color['dull']}){color}"
+        return line
+
+
+def build_call_tree(trace):
+    '''Builds a tree of CallFrame objects from an expanded trace.
+
+    Args:
+        trace: Expanded Trace object.
+
+    Returns: The root CallFrame.'''
+    root = CallFrame(trace, 0)
+    stack = [root]
+    depth, jump_depth = trace.column('depth'), trace.column('jumpDepth')
+    for i in range(1, len(trace)):
+        if depth[i] == depth[i-1] and jump_depth[i] == jump_depth[i-1]:
+            continue
+        # close frames that have returned
+        while len(stack) > 1 and (
+            depth[i] < stack[-1].depth or
+            (depth[i] == stack[-1].depth and jump_depth[i] < stack[-1].jump_depth)
+        ):
+            stack.pop().end = i
+        # an external call to a new contract, or a jump into an internal function
+        if depth[i] > depth[i-1] or (depth[i] == depth[i-1] and jump_depth[i] > jump_depth[i-1]):
+            stack.append(CallFrame(trace, i, stack[-1]))
+    return root
+
+
+class TraceStore(metaclass=_Singleton):
+
+    '''Persistent store of transaction traces, kept in the build folder of the
+    active project.
+
+    Traces are appended to build/traces.dat and their positions are recorded in
+    build/traces.idx. Only the index is held in memory, each trace is read from
+    the memory-mapped data file when it is requested. Stored traces are discarded
+    when the compiled bytecode of any contract in the project changes.
+
+    Replacing a trace leaves the old one behind as dead space. The files are
+    rewritten once dead space exceeds the size of the live traces, or when the
+    data file grows beyond _STORE_SIZE, in which case the oldest traces are
+    dropped.'''
+
+    def __init__(self):
+        self._path = None
+        self._signature = None
+        self._index = {}
+        self._mmap = None
+        self._size = 0
+        self._live = 0
+
+    def __contains__(self, txid):
+        return self._open() and txid in self._index
+
+    def __len__(self):
+        return len(self._index) if self._open() else 0
+
+    def _open(self):
+        # loads the index for the active project, returns False if there is none
+        if not CONFIG['folders']['project']:
+            self._close()
+            return False
+        path = Path(CONFIG['folders']['project']).joinpath('build')
+        signature = build.get_signature()
+        if path == self._path and signature == self._signature:
+            return True
+        # the project or its compiled bytecode has changed, stored traces are
+        # discarded if they were recorded against a different signature
+        self._close()
+        self._path = path
+        self._signature = signature
+        try:
+            size = path.joinpath('traces.dat').stat().st_size
+            with path.joinpath('traces.idx').open() as fp:
+                if fp.readline().split() != ["signature", self._signature]:
+                    raise FileNotFoundError
+                for line in fp:
+                    try:
+                        txid, key, level, offset, length = line.split()
+                        if int(offset) + int(length) <= size:
+                            self._index[txid] = (key, int(level), int(offset), int(length))
+                    except ValueError:
+                        continue
+            self._size = size
+            self._live = sum(i[3] for i in self._index.values())
+        except FileNotFoundError:
+            self._index = {}
+            self._unlink()
+        return True
+
+    def _close(self):
+        self._close_mmap()
+        self._path = None
+        self._index = {}
+        self._size = 0
+        self._live = 0
+
+    def _close_mmap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _read(self, offset, length):
+        if self._mmap is None or offset + length > len(self._mmap):
+            self._close_mmap()
+            with self._path.joinpath('traces.dat').open('rb') as fp:
+                self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[offset:offset+length]
+
+    def get(self, txid, key, level=LEVEL_DATA):
+        '''Returns a stored trace, or None if it is not available.
+
+        Args:
+            txid: Transaction hash.
+            key: Hash that must match the one given when the trace was stored.
+            level: Minimum level of detail required, traces that were
+                   stored with less data are ignored.
+
+        Returns: Trace object or None.'''
+        if not self._open() or txid not in self._index:
+            return None
+        stored_key, stored_level, offset, length = self._index[txid]
+        if stored_key != key or stored_level < level:
+            return None
+        data = self._read(offset, length)
+        try:
+            header_length = int.from_bytes(data[:4], "big")
+            header = json.loads(data[4:header_length+4].decode())
+            if header['txid'] != txid or header['key'] != key:
+                return None
+            return Trace._deserialize(header, data[header_length+4:])
+        except (ValueError, KeyError):
+            return None
+
+    def add(self, txid, key, trace, level=LEVEL_DATA):
+        '''Appends a trace to the store, replacing any previous trace for the
+        same transaction.
+
+        Args:
+            txid: Transaction hash.
+            key: Hash identifying this version of the transaction.
+            trace: Unexpanded Trace object.
+            level: Level of detail that the trace was retrieved with.'''
+        if not self._open() or not self._path.exists():
+            return
+        header, body = trace._serialize()
+        header.update({'txid': txid, 'key': key})
+        header = json.dumps(header, separators=(",", ":")).encode()
+        with self._path.joinpath('traces.dat').open('ab') as fp:
+            offset = fp.seek(0, 2)
+            fp.write(len(header).to_bytes(4, "big") + header + body)
+            length = fp.tell() - offset
+        with self._path.joinpath('traces.idx').open('a') as fp:
+            if not fp.tell():
+                fp.write(f"signature {self._signature}\n")
+            fp.write(f"{txid} {key} {level} {offset} {length}\n")
+        if txid in self._index:
+            self._live -= self._index[txid][3]
+        self._index[txid] = (key, level, offset, length)
+        self._size = offset + length
+        self._live += length
+        if self._size - self._live > self._live or self._size > _STORE_SIZE:
+            self._compact()
+
+    def _compact(self):
+        # rewrites the store without dead space, dropping the oldest traces
+        # until the live data fits within half of _STORE_SIZE
+        entries = sorted(self._index.items(), key=lambda k: k[1][2])
+        while self._live > _STORE_SIZE // 2 and len(entries) > 1:
+            self._live -= entries.pop(0)[1][3]
+        dat_path = self._path.joinpath('traces.dat.tmp')
+        idx_path = self._path.joinpath('traces.idx.tmp')
+        index = {}
+        with dat_path.open('wb') as dat, idx_path.open('w') as idx:
+            idx.write(f"signature {self._signature}\n")
+            for txid, (key, level, offset, length) in entries:
+                index[txid] = (key, level, dat.tell(), length)
+                idx.write(f"{txid} {key} {level} {dat.tell()} {length}\n")
+                dat.write(self._read(offset, length))
+        self._close_mmap()
+        dat_path.replace(self._path.joinpath('traces.dat'))
+        idx_path.replace(self._path.joinpath('traces.idx'))
+        self._index = index
+        self._size = self._live = sum(i[3] for i in index.values())
+
+    def clear(self):
+        '''Deletes all stored traces for the active project.'''
+        if not self._open():
+            return
+        self._unlink()
+        self._close()
+
+    def _unlink(self):
+        for name in ('traces.dat', 'traces.idx'):
+            if self._path.joinpath(name).exists():
+                self._path.joinpath(name).unlink()
+
+
+def stream_struct_logs(txid, options):
+    '''Yields the structLogs from debug_traceTransaction one step at a time.
+
+    With an HTTP provider the response is read in chunks and each step is
+    decoded as soon as it has arrived, so the complete response is never held
+    in memory. Other providers fall back to a regular request.
+
+    Args:
+        txid: transaction hash
+        options: dict of options for debug_traceTransaction
+
+    Yields: structLog step dicts'''
+    provider = web3.providers[0]
+    if type(provider) is not HTTPProvider:
+        response = provider.make_request('debug_traceTransaction', (txid, options))
+        if 'error' in response:
+            raise RPCRequestError(response['error']['message'])
+        yield from response['result']['structLogs']
+        return
+    kwargs = provider.get_request_kwargs()
+    kwargs.setdefault('timeout', 10)
+    response = requests.post(
+        provider.endpoint_uri,
+        data=provider.encode_rpc_request('debug_traceTransaction', (txid, options)),
+        stream=True,
+        **kwargs
+    )
+    try:
+        response.raise_for_status()
+        yield from _parse_struct_logs(response.iter_content(_CHUNK_SIZE))
+    finally:
+        response.close()
+
+
+def _parse_struct_logs(chunks):
+    chunks = _decode_chunks(chunks)
+    decoder = json.JSONDecoder()
+    buffer = ""
+
+    # find the beginning of the structLogs array
+    while True:
+        pos = buffer.find('"structLogs"')
+        if pos != -1 and buffer.find("[", pos) != -1:
+            pos = buffer.find("[", pos) + 1
+            break
+        try:
+            buffer += next(chunks)
+        except StopIteration:
+            _raise_response_error(buffer)
+
+    while True:
+        # skip whitespace and commas between steps
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = _read_chunk(chunks, buffer[pos:]), 0
+            continue
+        if buffer[pos] == "]":
+            return
+        start, depth = pos, 0
+        while True:
+            pos, depth = _find_object_end(buffer, pos, depth)
+            if not depth:
+                break
+            buffer, pos, start = _read_chunk(chunks, buffer[start:]), pos-start, 0
+        step, pos = decoder.raw_decode(buffer, start)
+        yield step
+        buffer, pos = buffer[pos:], 0
+
+
+def _decode_chunks(chunks):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in chunks:
+        yield decoder.decode(chunk)
+
+
+def _read_chunk(chunks, buffer):
+    try:
+        return buffer + next(chunks)
+    except StopIteration:
+        raise RPCRequestError("Incomplete response from debug_traceTransaction") from None
+
+
+def _find_object_end(buffer, pos, depth):
+    # scans the buffer for the end of a json object, returning the position and
+    # the current depth. a depth of 0 means the end of the object was found.
+    while True:
+        match = _TOKENS.search(buffer, pos)
+        if not match:
+            return len(buffer), depth
+        pos = match.start()
+        if buffer[pos] == '"':
+            end = _find_string_end(buffer, pos+1)
+            if end == -1:
+                # string continues in the next chunk, resume from the opening quote
+                return pos, depth
+            pos = end + 1
+            continue
+        depth += 1 if buffer[pos] == "{" else -1
+        pos += 1
+        if not depth:
+            return pos, 0
+
+
+def _find_string_end(buffer, pos):
+    while True:
+        pos = buffer.find('"', pos)
+        if pos == -1:
+            return -1
+        escapes = 0
+        while buffer[pos-escapes-1] == "\\":
+            escapes += 1
+        if not escapes % 2:
+            return pos
+        pos += 1
+
+
+def _raise_response_error(buffer):
+    try:
+        response = json.loads(buffer)
+        message = response['error']['message']
+    except (ValueError, KeyError, TypeError):
+        message = "Unexpected response from debug_traceTransaction"
+    raise RPCRequestError(message)
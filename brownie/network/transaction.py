@@ -2,8 +2,6 @@
 
 from hashlib import sha1
 import requests
-import threading
-import time
 
 from eth_abi import decode_abi
 from hexbytes import HexBytes
@@ -16,6 +14,8 @@ from .event import (
     decode_logs,
     decode_trace
 )
+from .confirmation import ConfirmationEngine
+from . import trace as trace_module
 from .web3 import Web3
 from brownie.convert import Wei
 from brownie.cli.utils import color
@@ -26,6 +26,8 @@ from brownie._config import ARGV
 
 history = TxHistory()
 _contracts = _ContractHistory()
+_trace_store = trace_module.TraceStore()
+_confirmations = ConfirmationEngine()
 web3 = Web3()
 
 
@@ -60,11 +62,14 @@ class TransactionReceipt:
 
         events: Decoded transaction log events
         trace: Expanded stack trace from debug_traceTransaction
+        call_tree: Tree of CallFrame objects built from the trace
         return_value: Return value(s) from contract call
         revert_msg: Error string from reverted contract all
         modified_state: Boolean, did this contract write to storage?'''
 
-    def __init__(self, txid, sender=None, silent=False, name='', callback=None, revert=None):
+    def __init__(
+        self, txid, sender=None, silent=False, name='', callback=None, revert=None, wait=True
+    ):
         '''Instantiates a new TransactionReceipt object.
 
         Args:
@@ -74,6 +79,8 @@ class TransactionReceipt:
             name: contract function being called
             callback: optional callback function
             revert: (revert string, program counter)
+            wait: if False, returns without waiting for confirmation. Call
+                  TransactionReceipt.wait to block until it has confirmed.
         '''
         if type(txid) is not str:
             txid = txid.hex()
@@ -82,6 +89,8 @@ class TransactionReceipt:
         history._add_tx(self)
 
         self._trace = None
+        self._trace_level = None
+        self._expanded = False
         self._revert_pc = None
         self.block_number = None
         self.contract_address = None
@@ -115,19 +124,23 @@ class TransactionReceipt:
                 if type(revert[0]) is str:
                     self.revert_msg = revert[0]
 
-        # threaded to allow impatient users to ctrl-c to stop waiting in the console
-        confirm_thread = threading.Thread(
-            target=self._await_confirmation,
-            args=(silent, callback),
-            daemon=True
-        )
-        confirm_thread.start()
+        # confirmation is awaited in a shared thread, to allow impatient users
+        # to ctrl-c to stop waiting in the console
+        self._revert_data = revert
+        self._confirmation = _confirmations.add(self, silent, callback)
+        if wait:
+            self.wait()
+
+    def wait(self):
+        '''Blocks until the transaction has confirmed. If the transaction
+        reverted, raises VirtualMachineError.'''
+        revert = self._revert_data
         try:
-            confirm_thread.join()
+            self._confirmation.wait()
             if ARGV['cli'] == "console":
                 return
             # if coverage evaluation is active, evaluate the trace
-            if ARGV['coverage'] and not coverage.add_from_cached(self.coverage_hash) and self.trace:
+            if ARGV['coverage'] and not coverage.add_from_cached(self.coverage_hash):
                 self._expand_trace()
             if not self.status:
                 if revert[0] is None:
@@ -151,37 +164,28 @@ class TransactionReceipt:
 
     def __getattr__(self, attr):
         # these values require debug_traceTransaction, only request it from the RPC when needed
-        if attr not in {'events', 'modified_state', 'return_value', 'revert_msg', 'trace'}:
+        if attr not in {
+            'call_tree', 'events', 'modified_state', 'return_value', 'revert_msg', 'trace'
+        }:
             raise AttributeError(f"'TransactionReceipt' object has no attribute '{attr}'")
         if self.status == -1:
             return None
         if attr == "trace":
             self._expand_trace()
+            # the public trace has stack and memory at every step
+            if self._trace and self._trace_level < trace_module.LEVEL_FULL:
+                self._upgrade_trace(trace_module.LEVEL_FULL)
+            self.trace = self._trace
+        elif attr == "call_tree":
+            self._expand_trace()
+            self.call_tree = trace_module.build_call_tree(self._trace) if self._trace else None
+        elif attr == "events" and self.status:
+            # logs are only decoded when the events are first accessed
+            self.events = decode_logs(self.logs)
         elif self._trace is None:
             self._get_trace()
         return self.__dict__[attr]
 
-    def _await_confirmation(self, silent, callback):
-
-        # await tx showing in mempool
-        while True:
-            tx = web3.eth.getTransaction(self.txid)
-            if tx:
-                break
-            time.sleep(0.5)
-        self._set_from_tx(tx)
-
-        if not tx['blockNumber'] and not silent:
-            print("Waiting for confirmation...")
-
-        # await confirmation
-        receipt = web3.eth.waitForTransactionReceipt(self.txid, None)
-        self._set_from_receipt(receipt)
-        if not silent:
-            print(self._confirm_output())
-        if callback:
-            callback(self)
-
     def _set_from_tx(self, tx):
         if not self.sender:
             self.sender = tx['from']
@@ -193,11 +197,17 @@ class TransactionReceipt:
         self.nonce = tx['nonce']
 
         # if receiver is a known contract, set function name
-        if tx['to'] and _contracts.find(tx['to']) is not None:
-            self.receiver = _contracts.find(tx['to'])
+        contract = _contracts.find(tx['to']) if tx['to'] else None
+        if contract is not None:
+            self.receiver = contract
             if not self.fn_name:
                 self.contract_name = self.receiver._name
                 self.fn_name = self.receiver.get_method(tx['input'])
+        elif tx['to'] and not self.fn_name and len(tx['input']) >= 10:
+            # label calls to unregistered contracts using the project selectors
+            name, fn_name = _label_call(tx['input'])
+            if fn_name is not None:
+                self.contract_name, self.fn_name = name, fn_name
 
     def _set_from_receipt(self, receipt):
         '''Sets object attributes based on the transaction reciept.'''
@@ -214,10 +224,9 @@ class TransactionReceipt:
         )
         self.coverage_hash = sha1(base.encode()).hexdigest()
 
-        if self.status:
-            self.events = decode_logs(receipt['logs'])
         if self.fn_name:
             history._gas(self._full_name(), receipt['gasUsed'])
+        history._confirm_tx(self)
 
     def _confirm_output(self):
         status = ""
@@ -253,11 +262,43 @@ class TransactionReceipt:
             self.trace = []
             return
 
+        # in the console the full trace is kept for inspection. otherwise stack and
+        # memory are only requested when a return value or revert string must be
+        # decoded, or when coverage evaluation will expand the trace. in other
+        # cases they are added later if the trace is expanded and makes a call,
+        # and at every step when the trace attribute is accessed
+        if ARGV['cli'] == "console":
+            level = trace_module.LEVEL_STORAGE
+        elif not self.status or ARGV['coverage'] or self._returns_data():
+            level = trace_module.LEVEL_DATA
+        else:
+            level = trace_module.LEVEL_MINIMAL
+
+        trace = _trace_store.get(self.txid, self.coverage_hash, level)
+        if trace is None:
+            trace = trace_module.Trace()
+            trace.minimal = level == trace_module.LEVEL_MINIMAL
+            try:
+                for step in self._stream_trace(level):
+                    trace.append(step)
+            except RPCRequestError:
+                self.modified_state = None
+                raise
+            _trace_store.add(self.txid, self.coverage_hash, trace, level)
+        self._trace_level = level
+        self.modified_state = trace.find_op(("SSTORE",)) != -1
+        self._set_trace(trace)
+
+    def _stream_trace(self, level):
+        options = {'disableStorage': level < trace_module.LEVEL_STORAGE}
+        if level == trace_module.LEVEL_MINIMAL:
+            options.update({'disableMemory': True, 'disableStack': True})
         try:
-            trace = web3.providers[0].make_request(
-                'debug_traceTransaction',
-                (self.txid, {'disableStorage': ARGV['cli'] != "console"})
-            )
+            for step in trace_module.stream_struct_logs(self.txid, options):
+                if level == trace_module.LEVEL_DATA and step['op'] not in trace_module.DATA_OPS:
+                    step.pop('memory', None)
+                    step.pop('stack', None)
+                yield step
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
             msg = f"Encountered a {type(e).__name__} while requesting "
             msg += "debug_traceTransaction. The local RPC client has likely crashed."
@@ -266,24 +307,38 @@ class TransactionReceipt:
                 msg += " and apply @skipcoverage to this test."
             raise RPCRequestError(msg) from None
 
-        if 'error' in trace:
-            self.modified_state = None
-            raise RPCRequestError(trace['error']['message'])
-        self._trace = trace = trace['result']['structLogs']
+    def _upgrade_trace(self, level):
+        # adds the stack and memory that were not requested with the original trace
+        trace = self._trace
+        for i, step in enumerate(self._stream_trace(level)):
+            if 'stack' in step:
+                trace._set_data(i, {'memory': step['memory'], 'stack': step['stack']})
+        trace.minimal = False
+        self._trace_level = level
+        _trace_store.add(self.txid, self.coverage_hash, trace, level)
+
+    def _returns_data(self):
+        # return values are decoded from memory at the final step of the trace
+        if type(self.receiver) is str or not self.fn_name:
+            return False
+        fn = getattr(self.receiver, self.fn_name)
+        return not hasattr(fn, 'abi') or bool(fn.abi['outputs'])
+
+    def _set_trace(self, trace):
+        self._trace = trace
         if not trace:
-            self.modified_state = False
-        elif self.status:
+            return
+        if self.status:
             self._confirmed_trace(trace)
         else:
             self._reverted_trace(trace)
 
     def _confirmed_trace(self, trace):
-        self.modified_state = next((True for i in trace if i['op'] == "SSTORE"), False)
         step = trace[-1]
         if step['op'] != "RETURN" or type(self.receiver) is str:
             return
         # get return value
-        data = _get_memory(step, -1)
+        data = "0x" if trace.minimal else _get_memory(step, -1)
         fn = getattr(self.receiver, self.fn_name)
         self.return_value = fn.decode_abi(data)
         return
@@ -295,7 +350,7 @@ class TransactionReceipt:
         if self.revert_msg is not None:
             return
         # get revert message
-        step = next(i for i in trace if i['op'] in ("REVERT", "INVALID"))
+        step = trace[trace.find_op(("REVERT", "INVALID"))]
         if step['op'] == "REVERT" and int(step['stack'][-2], 16):
             # get returned error string from stack
             data = _get_memory(step, -1)[4:]
@@ -311,7 +366,7 @@ class TransactionReceipt:
             pc_map = build.get(step['contractName'])['pcMap']
             # if this is the function selector revert, check for a jump
             if 'first_revert' in pc_map[step['pc']]:
-                i = trace.index(step) - 4
+                i = step.index - 4
                 if trace[i]['pc'] != step['pc'] - 4:
                     step = trace[i]
             self.revert_msg = pc_map[step['pc']]['dev']
@@ -332,68 +387,84 @@ class TransactionReceipt:
         }
         '''
 
-        if 'trace' in self.__dict__:
+        if self._expanded:
             return
         if self._trace is None:
             self._get_trace()
-        self.trace = trace = self._trace
-        if not trace or 'fn' in trace[0]:
+        self._expanded = True
+        trace = self._trace
+        if not trace or trace.expanded:
             coverage.add(self.coverage_hash, {})
             return
 
         # last_map gives a quick reference of previous values at each depth
+        if type(self.receiver) is str:
+            name = self.contract_name or "UnknownContract"
+            address, pc_map = self.receiver, {}
+        else:
+            name = self.receiver._name
+            address, pc_map = self.receiver.address, self.receiver._build['pcMap']
         last_map = {0: {
-            'address': self.receiver.address,
+            'address': address,
             'contract': self.receiver,
-            'name': self.receiver._name,
+            'name': name,
             'fn': [self._full_name()],
             'jumpDepth': 0,
-            'pc_map': self.receiver._build['pcMap']
+            'pc_map': pc_map
         }}
 
-        coverage_eval = {self.receiver._name: {}}
+        coverage_eval = {name: {}}
         active_branches = set()
+        pc_column = trace.column('pc')
+        depth_column = trace.column('depth')
+        if trace.minimal and max(depth_column) > depth_column[0]:
+            # call signatures and addresses are read from the stack and memory
+            self._upgrade_trace(trace_module.LEVEL_DATA)
 
         for i in range(len(trace)):
             # if depth has increased, tx has called into a different contract
-            if trace[i]['depth'] > trace[i-1]['depth']:
+            if depth_column[i] > depth_column[i-1]:
+                step = trace[i-1]
                 # get call signature
-                stack_idx = -4 if trace[i-1]['op'] in {'CALL', 'CALLCODE'} else -3
-                offset = int(trace[i-1]['stack'][stack_idx], 16) * 2
-                sig = HexBytes("".join(trace[i-1]['memory'])[offset:offset+8]).hex()
+                stack_idx = -4 if step['op'] in {'CALL', 'CALLCODE'} else -3
+                offset = int(step['stack'][stack_idx], 16) * 2
+                sig = HexBytes("".join(step['memory'])[offset:offset+8]).hex()
 
                 # get contract and method name
-                address = web3.toChecksumAddress(trace[i-1]['stack'][-2][-40:])
+                address = web3.toChecksumAddress(step['stack'][-2][-40:])
                 contract = _contracts.find(address)
+                if contract is not None:
+                    name, fn_name = contract._name, contract.get_method(sig)
+                    pc_map = contract._build['pcMap']
+                else:
+                    # no source is available for an unregistered contract
+                    name, fn_name = _label_call(sig)
+                    pc_map = {}
 
                 # update last_map
-                last_map[trace[i]['depth']] = {
+                last_map[depth_column[i]] = {
                     'address': address,
                     'contract': contract,
-                    'name': contract._name,
-                    'fn': [f"{contract._name}.{contract.get_method(sig)}"],
+                    'name': name,
+                    'fn': [f"{name}.{fn_name or sig}"],
                     'jumpDepth': 0,
-                    'pc_map': contract._build['pcMap']
+                    'pc_map': pc_map
                 }
-                if contract._name not in coverage_eval:
-                    coverage_eval[contract._name] = {}
+                if name not in coverage_eval:
+                    coverage_eval[name] = {}
 
             # update trace from last_map
-            last = last_map[trace[i]['depth']]
-            trace[i].update({
-                'address': last['address'],
-                'contractName': last['name'],
-                'fn': last['fn'][-1],
-                'jumpDepth': last['jumpDepth'],
-                'source': False
-            })
-            pc = last['pc_map'][trace[i]['pc']]
-            if 'path' not in pc:
-                continue
-
-            trace[i]['source'] = {'filename': pc['path'], 'offset': pc['offset']}
-
-            if 'fn' not in pc:
+            last = last_map[depth_column[i]]
+            pc = last['pc_map'].get(pc_column[i], {})
+            trace._add_location(
+                last['address'],
+                last['name'],
+                last['fn'][-1],
+                last['jumpDepth'],
+                pc.get('path'),
+                pc.get('offset')
+            )
+            if 'path' not in pc or 'fn' not in pc:
                 continue
 
             # calculate coverage
@@ -407,7 +478,7 @@ class TransactionReceipt:
                         active_branches.add(pc['branch'])
                     elif pc['branch'] in active_branches:
                         # false, true
-                        key = 1 if trace[i+1]['pc'] == trace[i]['pc']+1 else 2
+                        key = 1 if pc_column[i+1] == pc_column[i]+1 else 2
                         coverage_eval[last['name']][pc['path']][key].add(pc['branch'])
                         active_branches.remove(pc['branch'])
 
@@ -418,7 +489,7 @@ class TransactionReceipt:
             # jump 'i' is calling into an internal function
             if pc['jump'] == 'i':
                 try:
-                    last['fn'].append(last['pc_map'][trace[i+1]['pc']]['fn'])
+                    last['fn'].append(last['pc_map'][pc_column[i+1]]['fn'])
                     last['jumpDepth'] += 1
                 except KeyError:
                     continue
@@ -426,6 +497,7 @@ class TransactionReceipt:
             elif pc['jump'] == "o" and last['jumpDepth'] > 0:
                 del last['fn'][-1]
                 last['jumpDepth'] -= 1
+        trace.expanded = True
         coverage.add(self.coverage_hash, dict((k, v) for k, v in coverage_eval.items() if v))
 
     def _full_name(self):
@@ -479,44 +551,11 @@ class TransactionReceipt:
 
         Lines highlighed in red ended with a revert.
         '''
-        trace = self.trace
-        if not trace:
+        if not self.call_tree:
             if not self.contract_address:
                 return
             raise NotImplementedError("Call trace is not available for deployment transactions.")
-
-        result = f"Call trace for '{color['value']}{self.txid}{color}':"
-        result += _step_print(trace[0], trace[-1], None, 0, len(trace))
-        indent = {0: 0}
-        indent_chars = [""]*1000
-
-        # (index, depth, jumpDepth) for relevent steps in the trace
-        trace_index = [(0, 0, 0)] + [
-            (i, trace[i]['depth'], trace[i]['jumpDepth'])
-            for i in range(1, len(trace)) if not _step_compare(trace[i], trace[i-1])
-        ]
-
-        for i, (idx, depth, jump_depth) in enumerate(trace_index[1:], start=1):
-            last = trace_index[i-1]
-            if depth > last[1]:
-                # called to a new contract
-                indent[depth] = trace_index[i-1][2] + indent[depth-1]
-                end = next((x[0] for x in trace_index[i+1:] if x[1] < depth), len(trace))
-                _depth = depth+indent[depth]
-                symbol, indent_chars[_depth] = _check_last(trace_index[i-1:])
-                indent_str = "".join(indent_chars[:_depth])+symbol
-                result += _step_print(trace[idx], trace[end-1], indent_str, idx, end)
-            elif depth == last[1] and jump_depth > last[2]:
-                # jumped into an internal function
-                end = next((
-                    x[0] for x in trace_index[i+1:] if x[1] < depth or
-                    (x[1] == depth and x[2] < jump_depth)
-                ), len(trace))
-                _depth = depth+jump_depth+indent[depth]
-                symbol, indent_chars[_depth] = _check_last(trace_index[i-1:])
-                indent_str = "".join(indent_chars[:_depth])+symbol
-                result += _step_print(trace[idx], trace[end-1], indent_str, idx, end)
-        print(result)
+        print(f"Call trace for '{color['value']}{self.txid}{color}':\n{self.call_tree.render()}")
 
     def traceback(self):
         print(self._traceback_string())
@@ -525,31 +564,23 @@ class TransactionReceipt:
         '''Returns an error traceback for the transaction.'''
         if self.status == 1:
             return ""
-        trace = self.trace
+        self._expand_trace()
+        trace = self._trace
         if not trace:
             if not self.contract_address:
                 return ""
             raise NotImplementedError("Traceback is not available for deployment transactions.")
 
-        try:
-            idx = next(i for i in range(len(trace)) if trace[i]['op'] in ("REVERT", "INVALID"))
-            trace_range = range(idx, -1, -1)
-        except StopIteration:
+        idx = trace.find_op(("REVERT", "INVALID"))
+        if idx == -1:
             return ""
+        result = [next(i for i in range(idx, -1, -1) if trace[i]['source'])]
 
-        result = [next(i for i in trace_range if trace[i]['source'])]
-        depth, jump_depth = trace[idx]['depth'], trace[idx]['jumpDepth']
-
-        while True:
-            try:
-                idx = next(
-                    i for i in trace_range if trace[i]['depth'] < depth or
-                    (trace[i]['depth'] == depth and trace[i]['jumpDepth'] < jump_depth)
-                )
-                result.append(idx)
-                depth, jump_depth = trace[idx]['depth'], trace[idx]['jumpDepth']
-            except StopIteration:
-                break
+        # each calling frame contributes the step that jumped into the next frame
+        frame = self.call_tree.find(idx)
+        while frame.parent is not None:
+            result.append(frame.start - 1)
+            frame = frame.parent
         return (
             f"{color}Traceback for '{color['value']}{self.txid}{color}':\n" +
             "\n".join(self._source_string(i, 0) for i in result[::-1])
@@ -577,10 +608,12 @@ class TransactionReceipt:
             self._revert_pc = None
 
         # iterate backward through the trace until a step has a source offset
-        trace = self.trace
+        self._expand_trace()
+        trace = self._trace
+        if not trace or trace.find_op(("REVERT", "INVALID")) == -1:
+            return ""
         trace_range = range(len(trace)-1, -1, -1)
         try:
-            idx = next(i for i in trace_range if trace[i]['op'] in {"REVERT", "INVALID"})
             idx = next(i for i in trace_range if trace[i]['source'])
             return self._source_string(idx, pad)
         except StopIteration:
@@ -598,13 +631,15 @@ class TransactionReceipt:
 
         Returns: source code string
         '''
-        source = self.trace[idx]['source']
+        self._expand_trace()
+        step = self._trace[idx]
+        source = step['source']
         if not source:
             return ""
         source = sources.get_highlighted_source(source['filename'], source['offset'], pad)
         if not source:
             return ""
-        return _format_source(source, self.trace[idx]['pc'], idx, self.trace[idx]['fn'])
+        return _format_source(source, step['pc'], idx, step['fn'])
 
 
 def _format_source(source, pc, idx, fn_name):
@@ -619,35 +654,14 @@ def _format_source(source, pc, idx, fn_name):
     )
 
 
-def _step_compare(a, b):
-    return a['depth'] == b['depth'] and a['jumpDepth'] == b['jumpDepth']
-
-
-def _check_last(trace_index):
-    initial = trace_index[0][1:]
-    try:
-        trace = next(i for i in trace_index[1:-1] if i[1:] == initial)
-    except StopIteration:
-        return "\u2514", "  "
-    i = trace_index[1:].index(trace) + 2
-    next_ = trace_index[i][1:]
-    if next_[0] < initial[0] or (next_[0] == initial[0] and next_[1] <= initial[1]):
-        return "\u2514", "  "
-    return "\u251c", "\u2502 "
-
-
-def _step_print(step, last_step, indent, start, stop):
-    print_str = f"\n{color['dull']}"
-    if indent is not None:
-        print_str += f"{indent}\u2500"
-    if last_step['op'] in {"REVERT", "INVALID"} and _step_compare(step, last_step):
-        contract_color = color("error")
-    else:
-        contract_color = color("contract_method" if not step['jumpDepth'] else "")
-    print_str += f"{contract_color}{step['fn']} {color['dull']}{start}:{stop}{color}"
-    if not step['jumpDepth']:
-        print_str += f"  {color['dull']}({color}{step['address']}{color['dull']}){color}"
-    return print_str
+def _label_call(calldata):
+    # returns a contract and method name for a call into an unregistered contract
+    matches = build.get_selector(calldata)
+    if not matches:
+        return "UnknownContract", None
+    names = set(i[0] for i in matches)
+    name = names.pop() if len(names) == 1 else "UnknownContract"
+    return name, matches[0][1]['name']
 
 
 def _get_memory(step, idx):
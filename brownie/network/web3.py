@@ -1,15 +1,26 @@
 #!/usr/bin/python3
 
+from concurrent.futures import Future
+from contextlib import contextmanager
+from itertools import count
+import json
 from pathlib import Path
+import threading
+
+import requests
 from web3 import (
     HTTPProvider,
     IPCProvider,
     WebsocketProvider,
     Web3 as _Web3
 )
+from web3.middleware import combine_middlewares
 
 from brownie._singleton import _Singleton
 
+_request_ids = count()
+_local = threading.local()
+
 
 class Web3(_Web3, metaclass=_Singleton):
 
@@ -37,3 +48,140 @@ class Web3(_Web3, metaclass=_Singleton):
         '''Disconnects from a provider'''
         if self.providers:
             self.providers.clear()
+
+    def batch(self):
+        '''Returns an RPCBatch. Requests made with it are sent together as a single
+        JSON-RPC batch when it is used as a context manager and the block exits.'''
+        return RPCBatch(self)
+
+    def _request_fn(self, make_request):
+        # wraps make_request in the same middlewares as a regular request
+        middlewares = tuple(self.middleware_stack)
+        middlewares += tuple(getattr(self.providers[0], 'middlewares', ()))
+        return combine_middlewares(middlewares, self, make_request)
+
+
+class _Batched(Exception):
+    pass
+
+
+class RPCBatch:
+
+    '''Coalesces JSON-RPC requests into a single batch request.
+
+    Each request is passed through the web3 middlewares twice: once to obtain
+    the formatted request, and again after the batch is sent to format the
+    result. Providers other than HTTPProvider send the requests sequentially.
+    Middlewares can share data between the requests of a batch through
+    _batch_context().'''
+
+    def __init__(self, web3):
+        self._web3 = web3
+        self._queue = []
+        self._context = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.send()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def request(self, method, params=None):
+        '''Adds a request to the batch.
+
+        Args:
+            method: JSON-RPC method name, e.g. "eth_getTransactionCount".
+            params: Sequence of parameters, given as they would be to web3.
+
+        Returns: concurrent.futures.Future, resolved when the batch is sent.'''
+        future = Future()
+        params = list(params or [])
+        request = {}
+
+        def capture(method, params):
+            request.update({'method': method, 'params': params})
+            raise _Batched
+
+        try:
+            # a middleware may return a result without reaching the provider
+            with _use_context(self._context):
+                result = _result(self._web3._request_fn(capture)(method, params))
+        except _Batched:
+            self._queue.append((method, params, request, future))
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        return future
+
+    def send(self):
+        '''Sends all queued requests.'''
+        queue, self._queue = self._queue, []
+        context, self._context = self._context, {}
+        if not queue:
+            return
+        try:
+            responses = self._send([i[2] for i in queue])
+        except Exception as e:
+            for *_, future in queue:
+                future.set_exception(e)
+            return
+        for (method, params, _, future), response in zip(queue, responses):
+            try:
+                fn = self._web3._request_fn(lambda method, params: response)
+                with _use_context(context):
+                    result = _result(fn(method, params))
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _send(self, queue):
+        provider = self._web3.providers[0]
+        if not isinstance(provider, HTTPProvider):
+            return [provider.make_request(i['method'], i['params']) for i in queue]
+        payload = [{
+            'jsonrpc': "2.0",
+            'method': i['method'],
+            'params': i['params'],
+            'id': next(_request_ids)
+        } for i in queue]
+        kwargs = provider.get_request_kwargs()
+        kwargs.setdefault('timeout', 10)
+        response = requests.post(provider.endpoint_uri, data=json.dumps(payload), **kwargs)
+        response.raise_for_status()
+        responses = response.json()
+        if type(responses) is not list:
+            # some clients reply with a single error when batches are unsupported
+            return [responses] * len(payload)
+        responses = dict((i.get('id'), i) for i in responses)
+        return [
+            responses.get(i['id'], {'error': {'message': "Missing from batch response"}})
+            for i in payload
+        ]
+
+
+def _batch_context():
+    '''Returns a dict shared by the middlewares while they handle the requests
+    of one RPCBatch, or None if the current request is not batched.'''
+    return getattr(_local, 'context', None)
+
+
+@contextmanager
+def _use_context(context):
+    previous = _batch_context()
+    _local.context = context
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+def _result(response):
+    if "error" in response:
+        raise ValueError(response["error"])
+    return response['result']
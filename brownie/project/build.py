@@ -1,8 +1,11 @@
 #!/usr/bin/python3
 
+from hashlib import sha1
 import json
 from pathlib import Path
 
+from eth_hash.auto import keccak
+
 from . import sources
 
 BUILD_KEYS = [
@@ -29,6 +32,8 @@ BUILD_KEYS = [
 
 _build = {}
 _revert_map = {}
+_selectors = None
+_signature = None
 _project_path = None
 
 
@@ -57,6 +62,31 @@ def get_dependents(contract_name):
     return [k for k, v in _build.items() if contract_name in v['dependencies']]
 
 
+def get_selector(selector):
+    '''Given a bytes4 function selector, returns a list of (contract name, ABI)
+    tuples for every contract in the project with a matching function. The
+    registry is built from the loaded build data the first time it is needed.'''
+    global _selectors
+    if _selectors is None:
+        _selectors = {}
+        for name, build_json in _build.items():
+            for abi in [i for i in build_json['abi'] if i['type'] == "function"]:
+                key = f"{abi['name']}({','.join(i['type'] for i in abi['inputs'])})".encode()
+                _selectors.setdefault("0x" + keccak(key).hex()[:8], []).append((name, abi))
+    return _selectors.get(selector[:10].lower(), [])
+
+
+def get_signature():
+    '''Returns a sha1 hash of the bytecode of every contract in the project.
+    The value changes whenever build data is added, removed or cleared.'''
+    global _signature
+    if _signature is None:
+        _signature = sha1(
+            "".join(sorted(v['bytecodeSha1'] for v in _build.values())).encode()
+        ).hexdigest()
+    return _signature
+
+
 def get_dev_revert(pc):
     '''Given the program counter from a stack trace that caused a transaction
     to revert, returns the commented dev string (if any).'''
@@ -115,25 +145,30 @@ def delete(contract_name):
 
     Args:
         contract_name: name of the contract to delete.'''
+    global _selectors, _signature
     del _build[_stem(contract_name)]
+    _selectors = _signature = None
     _absolute(contract_name).unlink()
 
 
 def clear():
     '''Clears all currently loaded build data.  No files are deleted.'''
-    global _project_path
+    global _project_path, _selectors, _signature
     _project_path = None
     _build.clear()
     _revert_map.clear()
+    _selectors = _signature = None
 
 
 def _add(build_json):
+    global _selectors, _signature
     contract_name = build_json['contractName']
     if "0" in build_json['pcMap']:
         build_json['pcMap'] = dict((int(k), v) for k, v in build_json['pcMap'].items())
     if build_json['compiler']['minify_source']:
         build_json = expand_build_offsets(build_json)
     _build[contract_name] = build_json
+    _selectors = _signature = None
     _generate_revert_map(build_json['pcMap'])
 
 
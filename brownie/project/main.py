@@ -7,7 +7,8 @@ import shutil
 import sys
 import zipfile
 
-from brownie.network.contract import ContractContainer
+from brownie.network.contract import ContractContainer, _method_tables
+from brownie.network.event import _save_topics
 from brownie.exceptions import ProjectAlreadyLoaded, ProjectNotFound
 from brownie.project import build, sources, compiler
 from brownie.test import coverage
@@ -111,6 +112,9 @@ def close(raises=True):
     build.clear()
     coverage.clear()
 
+    # clear caches keyed by the identity of each ABI
+    _method_tables.clear()
+
     # remove objects from namespace
     for name in sys.modules['brownie.project'].__all__.copy():
         if name == "__brownie_import_all__":
@@ -228,6 +232,7 @@ def _create_objects():
         # if running via interpreter, add to main namespace if package was imported via from
         elif '__brownie_import_all__' in sys.modules['__main__'].__dict__:
             sys.modules['__main__'].__dict__[name] = container
+    _save_topics()
     return result
 
 
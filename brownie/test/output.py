@@ -64,7 +64,11 @@ def print_gas_profile():
     print('\n\nGas Profile:')
     gas = TxHistory().gas_profile
     for i in sorted(gas):
-        print(f"{i} -  avg: {gas[i]['avg']:.0f}  low: {gas[i]['low']}  high: {gas[i]['high']}")
+        print(
+            f"{i} -  avg: {gas[i].avg:.0f}  median: {gas[i].median}  p90: {gas[i].p90}  "
+            f"p99: {gas[i].p99}  stddev: {gas[i].stddev:.0f}  low: {gas[i].low}  "
+            f"high: {gas[i].high}  count: {gas[i].count}"
+        )
 
 
 def print_coverage_totals(coverage_eval):
@@ -0,0 +1,10 @@
+pragma solidity ^0.5.0;
+
+contract EventTester {
+
+    event Indexed(address indexed sender, uint256 indexed value, uint256 amount);
+
+    function emitEvent(uint256 value, uint256 amount) external {
+        emit Indexed(msg.sender, value, amount);
+    }
+}
@@ -2,7 +2,7 @@
 
 import pytest
 
-from brownie.convert import format_input
+from brownie.convert import format_input, _compile
 from brownie.exceptions import InvalidABI
 
 abi = {
@@ -54,3 +54,11 @@ def test_wrong_length_nested_array():
 def test_non_sequence():
     with pytest.raises(TypeError):
         format_input(abi, ["123", (1,), ([1, 1], [2, 2]), "0xff"])
+
+
+def test_compiled_once():
+    _compile.cache_clear()
+    format_input(abi, [(1, 2, 3), (1,), ([1, 1], [2, 2]), "0xff"])
+    misses = _compile.cache_info().misses
+    format_input(abi, [(4, 5, 6), (1, 2), ([3, 3], [4, 4], [5, 5]), "0x01"])
+    assert _compile.cache_info().misses == misses
@@ -2,7 +2,7 @@
 
 import pytest
 
-from brownie.convert import to_address
+from brownie.convert import EthAddress, to_address
 
 addr = "0x14b0Ed2a7C4cC60DD8F676AE44D0831d3c9b2a9E"
 addr_encoded = b'\x14\xb0\xed*|L\xc6\r\xd8\xf6v\xaeD\xd0\x83\x1d<\x9b*\x9e'
@@ -26,3 +26,17 @@ def test_wrong_length():
         to_address(addr[:20])
     with pytest.raises(ValueError):
         to_address(addr+"00")
+
+
+def test_eth_address():
+    address = EthAddress(addr.lower())
+    assert address == addr
+    assert address == addr.lower()
+    assert address == EthAddress(addr_encoded)
+    assert address != "0x" + "00" * 20
+    assert hash(address) == hash(addr) == hash(EthAddress(addr_encoded))
+    assert {address: True}[addr]
+    assert {addr: True}[address]
+    assert len({address, addr, EthAddress(addr_encoded)}) == 1
+    with pytest.raises(TypeError):
+        address == "potato"
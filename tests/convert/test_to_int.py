@@ -2,7 +2,7 @@
 
 import pytest
 
-from brownie.convert import to_int
+from brownie.convert import to_int, to_int_list
 
 
 def test_success():
@@ -41,3 +41,11 @@ def test_type():
         assert to_int(0, "int"+str(i)) == 0
         with pytest.raises(ValueError):
             to_int(0, "int"+str(i-1))
+
+
+def test_list():
+    assert to_int_list([-128, 127], "int8") == [-128, 127]
+    with pytest.raises(OverflowError):
+        to_int_list([-129, 0], "int8")
+    with pytest.raises(OverflowError):
+        to_int_list([0, 128], "int8")
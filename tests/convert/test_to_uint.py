@@ -2,7 +2,7 @@
 
 import pytest
 
-from brownie.convert import to_uint
+from brownie.convert import to_uint, to_uint_list
 
 
 def test_success():
@@ -39,3 +39,16 @@ def test_type():
         assert to_uint(0, "uint"+str(i)) == 0
         with pytest.raises(ValueError):
             to_uint(0, "uint"+str(i-1))
+
+
+def test_list():
+    values = to_uint_list(["1 ether", "0.5 gwei", 12, "0x10"])
+    assert values == [10**18, 5*10**8, 12, 16]
+    assert values == [to_uint(i) for i in ["1 ether", "0.5 gwei", 12, "0x10"]]
+    assert to_uint_list(()) == []
+    with pytest.raises(OverflowError):
+        to_uint_list([1, 2, 256], "uint8")
+    with pytest.raises(OverflowError):
+        to_uint_list([1, -1])
+    with pytest.raises(ValueError):
+        to_uint_list([1], "uint7")
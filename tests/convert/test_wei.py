@@ -1,6 +1,6 @@
 #!/usr/bin/python3
 
-from brownie.convert import Wei
+from brownie.convert import Wei, to_wei_list
 
 
 def test_nonetype():
@@ -64,3 +64,13 @@ def test_gt():
 def test_ge():
     assert Wei("2 ether") >= "1 ether"
     assert Wei("2 ether") >= "2 ether"
+
+
+def test_list():
+    class Array:
+        def tolist(self):
+            return ["1 ether", 10, "0x10"]
+    values = to_wei_list(Array())
+    assert values == [10**18, 10, 16]
+    assert type(values[0]) is Wei
+    assert to_wei_list(["1.5 ether", "25 gwei"]) == [Wei("1.5 ether"), Wei("25 gwei")]
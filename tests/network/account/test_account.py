@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 
 from brownie import network, Wei
+from brownie.convert import EthAddress
 
 accounts = network.accounts
 web3 = network.web3
@@ -22,3 +23,19 @@ def test_balance(clean_network):
     balance = accounts[0].balance()
     assert type(balance) is Wei
     assert balance == "100 ether"
+
+
+def test_address_hash(token):
+    '''accounts, contracts, EthAddress and strings are interchangeable as keys'''
+    address = accounts[0].address
+    keys = {accounts[0], EthAddress(address.lower()), address}
+    assert len(keys) == 1
+    assert EthAddress(address) in {address: 1}
+    assert accounts[0] in {EthAddress(address): 1}
+    assert {accounts[0]: 1}[address] == 1
+    assert accounts[0] == EthAddress(address) == address
+    assert accounts[0] != accounts[1]
+    assert accounts[0] != "potato"
+    assert len({token, EthAddress(token.address), token.address}) == 1
+    assert token == EthAddress(token.address.lower())
+    assert token != accounts[0]
@@ -2,6 +2,8 @@
 
 import pytest
 
+from eth_hash.auto import keccak
+
 from brownie import network, accounts, config, web3
 from brownie.exceptions import VirtualMachineError
 from brownie.network.transaction import TransactionReceipt
@@ -139,3 +141,102 @@ def test_data():
     assert tx.input == "0x"
     tx = accounts[0].transfer(accounts[1], 1000, data="0x1234")
     assert tx.input == "0x1234"
+
+
+def test_send_many():
+    '''send many transactions before waiting on confirmations'''
+    nonce = accounts[0].nonce
+    txs = accounts[0].send_many([{'to': i, 'amount': 1000} for i in accounts[1:4]], wait=False)
+    for tx in txs:
+        tx.wait()
+    assert [i.status for i in txs] == [1, 1, 1]
+    assert [i.nonce for i in txs] == list(range(nonce, nonce + 3))
+    assert accounts[0].nonce == nonce + 3
+
+
+def test_send_many_revert(token):
+    '''a revert mid-batch is raised after every transaction has confirmed'''
+    nonce = accounts[0].nonce
+    balance = accounts[2].balance()
+    with pytest.raises(VirtualMachineError) as exc:
+        accounts[0].send_many([
+            {'to': accounts[1], 'amount': 1000},
+            {'to': token, 'amount': 10000},
+            {'to': accounts[2], 'amount': 1000}
+        ])
+    assert "1 of 3 transactions reverted" in str(exc.value)
+    assert accounts[0].nonce == nonce + 3
+    assert accounts[2].balance() == balance + 1000
+
+
+def test_nonce_resync():
+    '''nonce is synced from the network after a nonce error'''
+    nonce = accounts[0].nonce
+    accounts[0].nonce = nonce + 5
+    tx = accounts[0].transfer(accounts[1], 1000)
+    assert tx.nonce == nonce
+    assert accounts[0].nonce == nonce + 1
+
+
+def test_nonce_revert_reason(monkeypatch):
+    '''a revert reason that mentions a nonce does not resend the transaction'''
+    txid = "0x" + "ab" * 32
+    sent = []
+
+    def transact(self, tx):
+        sent.append(tx['nonce'])
+        raise ValueError({
+            'message': "VM Exception while processing transaction: revert nonce too low",
+            'code': -32000,
+            'data': {txid: {'error': "revert", 'program_counter': 100, 'reason': "nonce too low"}}
+        })
+
+    def sync(self):
+        raise AssertionError("nonce was synced")
+
+    nonce = accounts[0].nonce
+    monkeypatch.setattr('brownie.network.account.Account._transact', transact)
+    monkeypatch.setattr('brownie.network.account._NonceManager.sync', sync)
+    try:
+        result = accounts[0]._send(accounts[0]._transfer_tx(accounts[1], 1000, 21000, None, ""))
+        assert result == (txid, ["nonce too low", 99, "revert"])
+        assert sent == [nonce]
+    finally:
+        accounts[0].nonce = nonce
+
+
+def test_known_transaction(monkeypatch):
+    '''a transaction that the node already has is not broadcast again'''
+    local = accounts.add()
+    sent = []
+
+    def send_raw(raw_tx):
+        sent.append(raw_tx)
+        raise ValueError({'message': "known transaction", 'code': -32000})
+
+    monkeypatch.setattr(web3.eth, 'sendRawTransaction', send_raw)
+    txid, revert = local._send(local._transfer_tx(accounts[1], 0, 21000, 0, ""))
+    assert len(sent) == 1
+    assert txid == "0x" + keccak(sent[0]).hex()
+    assert revert is None
+    assert local.nonce == 1
+
+
+def test_known_transaction_hash(monkeypatch):
+    '''the hash of a known transaction is read from the error message'''
+    txid = "0x" + "ab" * 32
+    sent = []
+
+    def transact(self, tx):
+        sent.append(tx['nonce'])
+        raise ValueError({'message': f"known transaction: {txid[2:]}", 'code': -32000})
+
+    nonce = accounts[0].nonce
+    monkeypatch.setattr('brownie.network.account.Account._transact', transact)
+    try:
+        assert accounts[0]._send(accounts[0]._transfer_tx(accounts[1], 0, 21000, None, "")) == (
+            txid, None
+        )
+        assert sent == [nonce]
+    finally:
+        accounts[0].nonce = nonce
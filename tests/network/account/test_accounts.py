@@ -73,6 +73,27 @@ def test_clear():
     accounts._reset()
 
 
+def test_delitem():
+    a = accounts.add(priv_key)
+    assert addr in accounts
+    del accounts[-1]
+    assert addr not in accounts
+    with pytest.raises(UnknownAccount):
+        accounts.at(a)
+    removed = accounts[:2]
+    del accounts[:2]
+    assert len(accounts) == 8
+    assert removed[0] not in accounts
+    accounts._reset()
+
+
+def test_reset_nonces():
+    nonces = [i.nonce for i in accounts]
+    accounts._reset()
+    assert [i.nonce for i in accounts] == nonces
+    assert accounts.at(accounts[3].address.lower()) is accounts[3]
+
+
 def test_save(tmpdir, no_pass):
     a = accounts.add(priv_key)
     a.save(tmpdir+"/temp.json")
@@ -123,3 +144,19 @@ def test_load_not_exists(tmpdir, no_pass):
         accounts.load(tmpdir+"/temp.json")
     with pytest.raises(FileNotFoundError):
         accounts.load("temp")
+
+
+def test_load_many(tmpdir, no_pass):
+    a = accounts.add(priv_key)
+    a.save(tmpdir+"/temp.json")
+    b = accounts.add()
+    b.save(tmpdir+"/temp2.json")
+    accounts._reset()
+    passwords = {tmpdir+"/temp.json": "", tmpdir+"/temp2": ""}
+    loaded = accounts.load_many([tmpdir+"/temp.json", tmpdir+"/temp2"], passwords.get)
+    assert [i.address for i in loaded] == [addr, b.address]
+    assert len(accounts) == 12
+    assert accounts.at(addr) is loaded[0]
+    assert accounts.load_many([tmpdir+"/temp.json"], lambda k: "")[0] is loaded[0]
+    assert len(accounts) == 12
+    accounts._reset()
@@ -65,6 +65,15 @@ def test_set_methods():
             assert type(getattr(c, item['name'])) == ContractTx
 
 
+def test_lazy_methods():
+    c = Contract(str(accounts[1]), build.get('Token'), None)
+    assert 'transfer' not in c.__dict__
+    assert c.transfer is c.transfer
+    assert 'transfer' in c.__dict__
+    assert c._methods is Contract(str(accounts[2]), build.get('Token'), None)._methods
+    assert c.transfer.signature == c.signatures['transfer']
+
+
 def test_balance():
     balance = Contract(str(accounts[1]), build.get('Token'), None).balance()
     assert type(balance) is Wei
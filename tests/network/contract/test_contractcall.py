@@ -53,3 +53,10 @@ def test_always_transact(token, monkeypatch):
         assert tx.fn_name == "balanceOf"
     finally:
         ARGV['always_transact'] = False
+
+
+def test_encode_decode_many(token):
+    data = token.balanceOf.encode_many([(accounts[0],), (accounts[1],)])
+    assert data == [token.balanceOf.encode_abi(i) for i in accounts[:2]]
+    returned = [web3.eth.call({'to': token.address, 'data': i}) for i in data]
+    assert token.balanceOf.decode_many(returned) == [1000000, 0]
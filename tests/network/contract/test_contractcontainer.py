@@ -3,6 +3,7 @@
 import pytest
 
 from brownie import network, project, accounts
+from brownie.network.contract import decode_input
 
 
 def test_get_method():
@@ -42,3 +43,20 @@ def test_remove_at(clean_network):
         Token.remove(t2)
     with pytest.raises(TypeError):
         Token.remove(123)
+
+
+def test_decode_input(clean_network):
+    t = project.Token.deploy("", "", 0, 1000, {'from': accounts[0]})
+    tx = t.transfer(accounts[1], 100, {'from': accounts[0]})
+    assert project.Token.decode_input(tx.input) == ('transfer', [accounts[1].address, 100])
+    assert decode_input(tx.input) == ('transfer', [accounts[1].address, 100])
+    with pytest.raises(ValueError):
+        project.Token.decode_input("0xffffffff")
+
+
+def test_label_unregistered(clean_network):
+    t = project.Token.deploy("", "", 0, 1000, {'from': accounts[0]})
+    project.Token.remove(t)
+    tx = accounts[0].transfer(t.address, 0, data=t.transfer.encode_abi(accounts[1], 100))
+    assert tx.contract_name == "Token"
+    assert tx.fn_name == "transfer"
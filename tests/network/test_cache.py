@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+import pytest
+
+from brownie import accounts, rpc
+from brownie.network.cache import ReadCache
+from brownie.network.web3 import Web3
+
+web3 = Web3()
+
+
+@pytest.fixture
+def cache():
+    cache = ReadCache()
+    cache.enable(size=3, ttl=60)
+    cache.reset_stats()
+    yield cache
+    cache.disable()
+
+
+def test_hits(cache, token):
+    assert token.balanceOf(accounts[0]) == token.balanceOf(accounts[0])
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert len(cache) == 1
+
+
+def test_disabled(token):
+    cache = ReadCache()
+    assert not cache.is_enabled()
+    token.balanceOf(accounts[0])
+    assert len(cache) == 0
+
+
+def test_cleared_on_send(cache, token):
+    balance = token.balanceOf(accounts[1])
+    token.transfer(accounts[1], 100, {'from': accounts[0]})
+    assert token.balanceOf(accounts[1]) == balance + 100
+
+
+def test_cleared_on_revert(cache, token):
+    rpc.snapshot()
+    balance = accounts[1].balance()
+    accounts[0].transfer(accounts[1], 1000)
+    assert accounts[1].balance() == balance + 1000
+    rpc.revert()
+    assert accounts[1].balance() == balance
+
+
+def test_cleared_on_mine(cache):
+    accounts[0].balance()
+    assert len(cache)
+    rpc.mine()
+    assert len(cache) == 0
+
+
+def test_eviction(cache, token):
+    for i in range(5):
+        token.balanceOf(accounts[i])
+    assert len(cache) == 3
+    assert cache.evictions == 2
+    token.balanceOf(accounts[4])
+    assert cache.hits == 1
+    token.balanceOf(accounts[0])
+    assert cache.misses == 6
+
+
+def test_batch(cache, monkeypatch):
+    '''batched requests are counted once and share a block number check'''
+    get_height = cache._get_height
+    calls = []
+    monkeypatch.setattr(cache, '_get_height', lambda: calls.append(1) or get_height())
+    with web3.batch() as batch:
+        for i in range(3):
+            batch.request("eth_getBalance", [accounts[i].address, "latest"])
+    assert cache.misses == 3
+    assert len(calls) == 1
+    assert len(cache) == 3
+    accounts[0].balance()
+    assert cache.hits == 1
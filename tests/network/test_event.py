@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+
+import pytest
+
+from brownie import accounts, history, project
+from brownie.network import event
+from brownie.network.event import decode_logs, decode_trace, get_topics
+
+
+def test_get_topics(token):
+    topics = get_topics(token.abi)
+    assert topics == token.topics
+    assert topics['Transfer'] in event._topics
+    assert not event._dirty
+
+
+def test_decode_logs(token):
+    tx = token.transfer(accounts[1], 100, {'from': accounts[0]})
+    events = decode_logs(tx.logs)
+    assert str(events) == str(tx.events)
+    assert events['Transfer']['value'] == 100
+
+
+def test_decode_unknown_topic(token):
+    tx = token.transfer(accounts[1], 100, {'from': accounts[0]})
+    logs = [dict(i) for i in tx.logs]
+    logs[0]['topics'] = ["0x" + "ff" * 32]
+    events = decode_logs(logs)
+    assert len(events) == 1
+    assert events[0].name == "(unknown)"
+    assert 'topics' in events[0] and 'data' in events[0]
+
+
+def test_decode_abi_mismatch(token):
+    '''a log that does not match the ABI for its topic is not decoded'''
+    tx = token.transfer(accounts[1], 100, {'from': accounts[0]})
+    logs = [dict(i) for i in tx.logs]
+    logs[0]['topics'] = logs[0]['topics'][:-1]
+    events = decode_logs(logs)
+    assert events[0].name == "(unknown)"
+
+
+def test_decode_missing_data(token):
+    '''a log without the data for unindexed inputs is not decoded'''
+    tx = token.transfer(accounts[1], 100, {'from': accounts[0]})
+    logs = [dict(i) for i in tx.logs]
+    logs[0]['data'] = "0x"
+    events = decode_logs(logs)
+    assert events[0].name == "(unknown)"
+
+
+def test_decode_error_raised(token, monkeypatch):
+    '''errors other than an ABI mismatch are not hidden'''
+    tx = token.transfer(accounts[1], 100, {'from': accounts[0]})
+
+    def decode(self, topics, data):
+        raise ValueError("decoder failed")
+
+    monkeypatch.setattr('brownie.network.event._EventDecoder.decode', decode)
+    monkeypatch.setattr('brownie.network.event._decoders', {})
+    with pytest.raises(ValueError, match="decoder failed"):
+        decode_logs(tx.logs)
+
+
+def test_decode_trace(console_mode, token):
+    tx = token.transfer(accounts[1], 100, {'from': accounts[0]})
+    assert str(decode_trace(tx.trace)) == str(tx.events)
+
+
+def test_event_query(token):
+    start = token.tx.block_number
+    for i in range(1, 4):
+        token.transfer(accounts[i], i * 100, {'from': accounts[0]})
+    events = list(token.events.Transfer.get(start))
+    assert [i['value'] for i in events] == [100, 200, 300]
+    assert [i.block_number for i in events] == sorted(i.block_number for i in events)
+    assert all(i.address == token.address for i in events)
+    assert events[-1].txid == history[-1].txid
+    assert len(list(token.events.Transfer.get(start, events[0].block_number))) == 1
+
+
+def test_event_query_container(token):
+    events = list(project.Token.events.Transfer.get(0))
+    assert len(events) == len(list(token.events.Transfer.get(0)))
+
+
+def test_event_query_filters(token):
+    with pytest.raises(KeyError):
+        next(token.events.Transfer.get(0, filters={'from': accounts[0]}))
+
+
+def test_event_query_filter_topics():
+    '''indexed input filters are encoded as topics and narrow the results'''
+    tester = accounts[0].deploy(project.EventTester)
+    start = tester.tx.block_number
+    for i in range(1, 4):
+        tester.emitEvent(i, i * 10, {'from': accounts[i % 2]})
+    indexed = tester.events.Indexed
+    assert indexed._filter_topics({'value': 2}) == [None, "0x" + "00" * 31 + "02"]
+    assert [i['amount'] for i in indexed.get(start)] == [10, 20, 30]
+    assert [i['value'] for i in indexed.get(start, filters={'value': 2})] == [2]
+    assert [i['value'] for i in indexed.get(start, filters={'value': [1, 3]})] == [1, 3]
+    assert [i['value'] for i in indexed.get(start, filters={'sender': accounts[1]})] == [1, 3]
+
+
+def test_event_query_split(token, monkeypatch):
+    '''a range rejected by the node is split and retried'''
+    start = token.tx.block_number
+    for i in range(1, 4):
+        token.transfer(accounts[i], i * 100, {'from': accounts[0]})
+    expected = [i['value'] for i in token.events.Transfer.get(start)]
+    get_logs = event.web3.eth.getLogs
+    ranges = []
+
+    def limited_get_logs(params):
+        ranges.append((params['fromBlock'], params['toBlock']))
+        if params['toBlock'] - params['fromBlock'] > 1:
+            raise ValueError("query returned more than 10000 results")
+        return get_logs(params)
+
+    monkeypatch.setattr(event.web3.eth, 'getLogs', limited_get_logs)
+    monkeypatch.setattr('brownie.network.event._QUERY_BLOCKS', 100)
+    assert [i['value'] for i in token.events.Transfer.get(start)] == expected
+    assert ranges[0][1] - ranges[0][0] > 1
+    assert len(ranges) > 1
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 
-from brownie import history, accounts, rpc
+from brownie import history, accounts, project, rpc
+from brownie.network.history import GasStats, _ContractHistory
 
 
 def test_adds_tx(clean_network):
@@ -58,3 +59,86 @@ def test_of(clean_network):
     assert len(history.of_address(accounts[1])) == 1
     assert len(history.of_address(accounts[2])) == 1
     assert len(history.of_address(accounts[3])) == 1
+
+
+def test_filter(clean_network, token):
+    for i in range(1, 4):
+        accounts[0].transfer(accounts[i], "1 ether")
+    token.transfer(accounts[1], 100, {'from': accounts[0]})
+    assert len(history.filter(sender=accounts[0])) == 5
+    assert len(history.filter(sender=accounts[0].address, receiver=accounts[1])) == 1
+    assert len(history.filter(contract_name="Token", fn_name="transfer")) == 1
+    assert history.filter(fn_name="transfer")[0].receiver == token
+    assert len(history.filter(key=lambda k: k.value > 0)) == 3
+    assert len(history.filter(sender=accounts[0], status=1)) == 5
+    assert not history.filter(sender=accounts[4])
+
+
+def test_filter_order(clean_network):
+    for i in range(1, 4):
+        accounts[i].transfer(accounts[0], "1 ether")
+        accounts[0].transfer(accounts[i], "1 ether")
+    assert history.of_address(accounts[0]) == history.copy()
+    assert history.filter(receiver=accounts[0]) == history.copy()[::2]
+
+
+def test_revert_indexes(clean_network):
+    accounts[0].transfer(accounts[1], "1 ether")
+    rpc.snapshot()
+    for i in range(3):
+        accounts[0].transfer(accounts[1], "1 ether")
+    assert len(history.from_sender(accounts[0])) == 4
+    rpc.revert()
+    assert len(history.from_sender(accounts[0])) == 1
+    assert len(history.to_receiver(accounts[1])) == 1
+
+
+def test_revert_then_add(clean_network):
+    accounts[0].transfer(accounts[1], "1 ether")
+    rpc.snapshot()
+    for i in range(3):
+        accounts[0].transfer(accounts[1], "1 ether")
+    rpc.revert()
+    tx = accounts[0].transfer(accounts[1], "1 ether")
+    assert len(history) == 2
+    assert history[-1] == tx
+    assert history.from_sender(accounts[0]) == history.copy()
+
+
+def test_gas_profile(clean_network, token):
+    for i in range(1, 6):
+        token.transfer(accounts[i], 100, {'from': accounts[0]})
+    stats = history.gas_profile['Token.transfer']
+    gas_used = [i.gas_used for i in history.filter(fn_name="transfer")]
+    assert stats['count'] == stats.count == 5
+    assert stats['avg'] == sum(gas_used) / 5
+    assert stats['high'] == max(gas_used)
+    assert stats['low'] == min(gas_used)
+    assert min(gas_used) <= stats.median <= max(gas_used)
+    assert set(stats.keys()) == {'avg', 'count', 'high', 'low', 'median', 'p90', 'p99', 'stddev'}
+
+
+def test_gas_stats_merge():
+    a, b, c = GasStats(), GasStats(), GasStats()
+    for i in range(21000, 22000, 10):
+        a.add(i)
+        c.add(i)
+    for i in range(40000, 60000, 100):
+        b.add(i)
+        c.add(i)
+    a.merge(GasStats.from_dict(b.to_dict()))
+    for key in ('avg', 'count', 'high', 'low', 'median', 'p90', 'p99'):
+        assert a[key] == c[key]
+    assert round(a.stddev, 6) == round(c.stddev, 6)
+    assert abs(a.p90 - 57900) / 57900 < 0.01
+
+
+def test_contract_find(clean_network):
+    t = project.Token.deploy("", "", 0, 0, {'from': accounts[0]})
+    contracts = _ContractHistory()
+    assert contracts.find(t.address) is t
+    assert contracts.find(t.address.lower()) is t
+    assert contracts.find(accounts[1].address) is None
+    assert contracts.find("potato") is None
+    project.Token.remove(t)
+    assert contracts.find(t.address) is None
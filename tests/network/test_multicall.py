@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+
+from concurrent.futures import Future
+import pytest
+
+from brownie import accounts, multicall
+from brownie.exceptions import VirtualMachineError
+from brownie.network.multicall import Multicall
+
+
+def test_batch(token):
+    with multicall() as m:
+        supply = token.totalSupply()
+        balances = [token.balanceOf(i) for i in accounts[:3]]
+        assert len(m) == 4
+    assert isinstance(supply, Future)
+    assert supply.result() == token.totalSupply()
+    assert [i.result() for i in balances] == [token.balanceOf(i) for i in accounts[:3]]
+    assert len(m) == 0
+
+
+def test_aggregate(token):
+    aggregator = Multicall.deploy(accounts[0])
+    with multicall(aggregator) as m:
+        supply = token.totalSupply()
+        balance = token.balanceOf(accounts[0])
+        name = token.name()
+    assert m.address == aggregator.address
+    assert supply.result() == token.totalSupply()
+    assert balance.result() == token.balanceOf(accounts[0])
+    assert name.result() == token.name()
+
+
+def test_revert(tester):
+    with multicall():
+        ok = tester.returnMultiple(1, True, accounts[0], "0x1234")
+        failed = tester.testRevertStrings.call(0)
+    assert ok.result() == tester.returnMultiple(1, True, accounts[0], "0x1234")
+    with pytest.raises(VirtualMachineError):
+        failed.result()
+
+
+def test_no_nesting(token):
+    with multicall():
+        with pytest.raises(RuntimeError):
+            with multicall():
+                pass
+    assert token.totalSupply() == 1000000
+
+
+def test_explicit_sender_not_aggregated(token):
+    aggregator = Multicall.deploy(accounts[0])
+    with multicall(aggregator) as m:
+        supply = token.totalSupply()
+        balance = token.balanceOf(accounts[0], {'from': accounts[1]})
+        assert [i[3] for i in m._queue] == [True, False]
+    assert supply.result() == token.totalSupply()
+    assert balance.result() == token.balanceOf(accounts[0])
+
+
+def test_always_transact_returns_future(coverage_mode, tester):
+    with multicall() as m:
+        value = tester.returnMultiple(1, True, accounts[0], "0x1234")
+        assert len(m) == 0
+    assert isinstance(value, Future)
+    assert value.result() == tester.returnMultiple(1, True, accounts[0], "0x1234")
@@ -109,3 +109,19 @@ def test_hexstring_length(ret):
     b = ret[3]
     assert b == "0x1234"
     assert b == "0x000000000000001234"
+
+
+def test_shared_layout(ret, tester):
+    other = tester.returnMultiple(1, True, accounts[1], "0x00")
+    assert other._layout is ret._layout
+    assert ret[1:3]._layout is ret[1:3]._layout
+    assert not hasattr(ret, '__dict__')
+
+
+def test_layout_keyed_by_names():
+    '''separate ABIs with the same output names share a layout'''
+    abis = [{'outputs': [{'name': "a", 'type': "uint256"}, {'name': "", 'type': "bool"}]}]
+    abis.append({'outputs': [dict(i) for i in abis[0]['outputs']]})
+    values = [ReturnValue((1, True), i) for i in abis]
+    assert values[0]._layout is values[1]._layout
+    assert values[0]['a'] == 1
@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+
+import pytest
+
+from brownie import accounts
+from brownie.network.web3 import Web3
+
+web3 = Web3()
+
+
+def test_batch_results():
+    '''batched results are formatted the same as regular requests'''
+    accounts[0].transfer(accounts[1], "1 ether")
+    with web3.batch() as batch:
+        nonce = batch.request("eth_getTransactionCount", [accounts[0].address, "latest"])
+        balance = batch.request("eth_getBalance", [accounts[1].address, "latest"])
+        height = batch.request("eth_blockNumber")
+        assert not nonce.done()
+    assert nonce.result() == web3.eth.getTransactionCount(accounts[0].address)
+    assert balance.result() == web3.eth.getBalance(accounts[1].address)
+    assert height.result() == web3.eth.blockNumber
+
+
+def test_batch_send():
+    batch = web3.batch()
+    code = batch.request("eth_getCode", [accounts[0].address, "latest"])
+    assert len(batch) == 1
+    batch.send()
+    assert len(batch) == 0
+    assert code.result() == web3.eth.getCode(accounts[0].address)
+
+
+def test_batch_error():
+    '''errors are raised when the result of a failed request is accessed'''
+    with web3.batch() as batch:
+        bad = batch.request("eth_notAMethod", [])
+        good = batch.request("eth_blockNumber")
+    with pytest.raises(ValueError):
+        bad.result()
+    assert good.result() == web3.eth.blockNumber
@@ -102,6 +102,16 @@ def test_events(console_mode, tester):
     assert 'Debug' in tx.events
 
 
+def test_events_lazy(tester):
+    '''logs are decoded when events are first accessed'''
+    tx = tester.testRevertStrings(5)
+    assert 'events' not in tx.__dict__
+    assert tx.events.count('Debug') == 1
+    assert tx.events.count('Foo') == 0
+    assert 'events' in tx.__dict__
+    assert not tx._trace
+
+
 def test_hash(tester):
     a = tester.doNothing()
     b = tester.doNothing()
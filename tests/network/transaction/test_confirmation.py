@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+import pytest
+
+from brownie import accounts
+from brownie.network.confirmation import ConfirmationEngine
+from brownie.network.transaction import TransactionReceipt
+
+
+def test_engine_stops():
+    '''the confirmation thread exits once nothing is pending'''
+    engine = ConfirmationEngine()
+    accounts[0].transfer(accounts[1], "1 ether")
+    thread = engine._thread
+    if thread is not None:
+        thread.join(2)
+    assert len(engine) == 0
+    assert engine._thread is None
+
+
+def test_filter_kept():
+    '''the block filter is reused when the confirmation thread restarts'''
+    engine = ConfirmationEngine()
+    accounts[0].transfer(accounts[1], 100)
+    block_filter = engine._filter
+    accounts[0].transfer(accounts[1], 100)
+    assert engine._filter is block_filter
+
+
+def test_shared_engine():
+    '''many receipts are confirmed by the same engine'''
+    txs = [accounts[0].transfer(accounts[1], 100) for i in range(5)]
+    receipts = [TransactionReceipt(i.txid, silent=True) for i in txs]
+    assert [i.block_number for i in receipts] == [i.block_number for i in txs]
+    assert [i.status for i in receipts] == [1] * 5
+
+
+def test_callback():
+    tx = accounts[0].transfer(accounts[1], "1 ether")
+    result = []
+    TransactionReceipt(tx.txid, silent=True, callback=result.append)
+    assert len(result) == 1
+    assert result[0].txid == tx.txid
+
+
+def test_error_raised():
+    '''exceptions in the confirmation thread are raised in the waiting thread'''
+    tx = accounts[0].transfer(accounts[1], "1 ether")
+
+    def callback(tx):
+        raise ValueError("callback failed")
+
+    with pytest.raises(ValueError, match="callback failed"):
+        TransactionReceipt(tx.txid, silent=True, callback=callback)
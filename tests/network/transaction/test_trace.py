@@ -3,7 +3,11 @@
 '''debug_traceTransaction is a very expensive call and should be avoided where
 possible. These tests check that it is only being called when absolutely necessary.'''
 
+import json
+
 from brownie import accounts, project
+from brownie.network.trace import DATA_OPS, CallFrame, Trace, TraceStore, _parse_struct_logs
+from brownie.network.transaction import TransactionReceipt
 from brownie.project import build
 
 
@@ -30,7 +34,7 @@ def test_revert_msg_get_trace_no_revert_map(console_mode, tester):
     try:
         tx = tester.testRevertStrings(1)
         tx.revert_msg
-        assert 'trace' in tx.__dict__
+        assert tx._expanded
     finally:
         build._revert_map = revert_map
 
@@ -51,7 +55,7 @@ def test_revert_events(console_mode, tester):
     assert len(tx.events) == 1
     assert 'Debug' in tx.events
     assert tx._trace
-    assert 'trace' not in tx.__dict__
+    assert not tx._expanded
 
 
 def test_modified_state(console_mode, tester):
@@ -59,7 +63,7 @@ def test_modified_state(console_mode, tester):
     tx = tester.doNothing()
     tx.modified_state
     assert tx._trace
-    assert 'trace' not in tx.__dict__
+    assert not tx._expanded
 
 
 def test_modified_state_revert(console_mode, tester):
@@ -79,15 +83,21 @@ def test_coverage_trace(coverage_mode, tester):
     '''coverage mode always evaluates the trace'''
     tx = tester.doNothing()
     assert tx.status == 1
-    assert 'trace' in tx.__dict__
+    assert tx._trace.expanded
+
+
+def test_coverage_trace_not_minimal(coverage_mode, tester):
+    '''coverage mode requests stack and memory up front'''
+    tx = tester.doNothing()
+    assert not tx._trace.minimal
 
 
 def test_source(tester):
     '''querying source always evaluates the trace'''
     tx = tester.doNothing()
-    assert 'trace' not in tx.__dict__
+    assert not tx._expanded
     tx.source(-5)
-    assert 'trace' in tx.__dict__
+    assert tx._expanded
 
 
 def test_info(console_mode, tester):
@@ -106,10 +116,10 @@ def test_call_trace(console_mode, tester):
     tx = tester.doNothing()
     assert not tx._trace
     tx.call_trace()
-    assert 'trace' in tx.__dict__
+    assert tx._expanded
     tx = tester.testRevertStrings(1)
     tx.call_trace()
-    assert 'trace' in tx.__dict__
+    assert tx._expanded
 
 
 def test_trace_deploy(tester):
@@ -128,7 +138,7 @@ def test_expand_first(tester):
     tx = tester.doNothing()
     assert not tx._trace
     tx._expand_trace()
-    assert 'trace' in tx.__dict__
+    assert tx._expanded
 
 
 def test_expand_multiple(tester):
@@ -158,3 +168,187 @@ def test_revert_string_from_trace(console_mode, tester):
     tx.revert_msg = None
     tx._reverted_trace(tx.trace)
     assert tx.revert_msg == msg
+
+
+def test_trace_data_stripped(tester):
+    '''outside of the console, memory and stack are only kept where they are evaluated'''
+    tx = tester.testRevertStrings(2)
+    tx._get_trace()
+    assert next(i for i in tx._trace if 'memory' in i)
+    assert not next((i for i in tx._trace if i['op'] not in DATA_OPS and 'memory' in i), False)
+
+
+def test_trace_data_console(console_mode, tester):
+    '''the console keeps memory and stack for every step'''
+    tx = tester.doNothing()
+    assert 'memory' in tx.trace[0]
+    assert 'stack' in tx.trace[0]
+
+
+def test_trace_object(tester):
+    '''the trace is stored as a Trace with dict-like steps'''
+    tx = tester.doNothing()
+    assert type(tx.trace) is Trace
+    assert tx.trace.expanded
+    step = tx.trace[-1]
+    assert step == dict(step.items())
+    assert tx.trace.index(step) == len(tx.trace) - 1
+    assert 'fn' in step
+    assert step['fn'] == "BrownieTester.doNothing"
+
+
+def test_trace_columns(tester):
+    '''trace columns match the values of each step'''
+    tx = tester.doNothing()
+    for key in ('pc', 'depth', 'gas', 'gasCost', 'jumpDepth'):
+        assert list(tx.trace.column(key)) == [i[key] for i in tx.trace]
+
+
+def test_trace_find_op(console_mode, tester):
+    tx = tester.testRevertStrings(1)
+    idx = tx.trace.find_op(["REVERT"])
+    assert tx.trace[idx]['op'] == "REVERT"
+    assert tx.trace.find_op(["REVERT"], stop=idx) == -1
+    assert tx.trace.find_op(["PUSH1"], reverse=True) > tx.trace.find_op(["PUSH1"])
+    assert tx.trace.find_op(["NOTANOP"]) == -1
+
+
+def test_trace_store(tester, monkeypatch):
+    '''traces are stored in the project and reused without querying the rpc'''
+    tx = tester.doNothing()
+    tx.trace
+    assert tx.txid in TraceStore()
+    monkeypatch.setattr('brownie.network.trace.stream_struct_logs', None)
+    tx2 = TransactionReceipt(tx.txid, silent=True)
+    assert [dict(i) for i in tx2.trace] == [dict(i) for i in tx.trace]
+    assert tx2.modified_state == tx.modified_state
+
+
+def test_trace_store_recompile(tester):
+    '''stored traces are not used after the project bytecode changes'''
+    tx = tester.doNothing()
+    tx.trace
+    store = TraceStore()
+    key, level = store._index[tx.txid][:2]
+    build_json = build.get("BrownieTester")
+    build._add(dict(build_json, bytecodeSha1="00" * 20))
+    try:
+        assert store.get(tx.txid, key, level) is None
+        assert tx.txid not in store
+    finally:
+        build._add(build_json)
+    assert tx.txid not in store
+
+
+def test_trace_store_compaction(tester):
+    '''replacing a stored trace does not leave the store growing without bound'''
+    tx = tester.doNothing()
+    tx.trace
+    store = TraceStore()
+    key, level = store._index[tx.txid][:2]
+    trace = store.get(tx.txid, key, level)
+    for i in range(len(store) + 2):
+        store.add(tx.txid, key, trace, level)
+        size = store._path.joinpath('traces.dat').stat().st_size
+        assert size <= 2 * sum(v[3] for v in store._index.values())
+    assert store.get(tx.txid, key, level) is not None
+
+
+def test_trace_store_size(tester, monkeypatch):
+    '''the oldest traces are dropped when the store exceeds its maximum size'''
+    tx = tester.doNothing()
+    tx.trace
+    store = TraceStore()
+    key, level = store._index[tx.txid][:2]
+    trace = store.get(tx.txid, key, level)
+    monkeypatch.setattr('brownie.network.trace._STORE_SIZE', 1)
+    store.add(tx.txid, key, trace, level)
+    assert list(store._index) == [tx.txid]
+    assert store.get(tx.txid, key, level) is not None
+
+
+def test_trace_minimal(tester):
+    '''stack and memory are not requested when there is no data to decode'''
+    tx = tester.doNothing()
+    tx._get_trace()
+    assert tx._trace.minimal
+    assert not next((i for i in tx._trace if 'stack' in i), False)
+    tx = tester.testRevertStrings(2)
+    tx._get_trace()
+    assert not tx._trace.minimal
+
+
+def test_trace_minimal_external_call():
+    '''expanding a minimal trace retrieves data where an external call is made'''
+    ext = accounts[0].deploy(project.ExternalCallTester)
+    other = accounts[0].deploy(project.Other)
+    tx = ext.callAnother(other, 4)
+    tx._returns_data = lambda: False
+    tx._get_trace()
+    assert tx._trace.minimal
+    tx._expand_trace()
+    assert not tx._trace.minimal
+    assert next(i for i in tx._trace if i['depth'] != 0)['fn'] == "Other.getCalled"
+
+
+def test_trace_minimal_upgraded(tester):
+    '''the public trace includes stack and memory at every step'''
+    tx = tester.doNothing()
+    tx._get_trace()
+    assert tx._trace.minimal
+    trace = tx.trace
+    assert not trace.minimal
+    assert trace.expanded
+    assert all('stack' in i and 'memory' in i for i in trace)
+
+
+def test_call_tree():
+    '''the call tree contains a frame for each external call and internal jump'''
+    ext = accounts[0].deploy(project.ExternalCallTester)
+    other = accounts[0].deploy(project.Other)
+    tx = ext.callAnother(other, 4)
+    root = tx.call_tree
+    assert type(root) is CallFrame
+    assert root.start == 0
+    assert root.end == len(tx.trace)
+    assert root.fn == "ExternalCallTester.callAnother"
+    assert root.address == ext.address
+    frames = list(root.walk())
+    assert [i.start for i in frames] == sorted(i.start for i in frames)
+    called = root.filter(fn="Other.getCalled", jump_depth=0)
+    assert len(called) == 1
+    assert called[0].address == other.address
+    assert called[0].depth == root.depth + 1
+    assert root.find(called[0].start) == called[0]
+    assert root.find(0) == root
+    assert not root.filter(reverted=True)
+
+
+def test_call_tree_reverted(console_mode):
+    ext = accounts[0].deploy(project.ExternalCallTester)
+    other = accounts[0].deploy(project.Other)
+    tx = ext.callAnother(other, 1)
+    idx = tx.trace.find_op(["REVERT"])
+    assert tx.call_tree.find(idx).reverted
+    assert tx.call_tree.filter(key=lambda k: k.reverted)
+
+
+def test_parse_struct_logs_chunked():
+    '''steps split across chunk boundaries are parsed the same as json.loads'''
+    steps = [{
+        'pc': i,
+        'op': "PUSH1",
+        'gas': 123456789012345678901234567890 - i,
+        'memory': ["00" * 32],
+        'stack': ['ff"\\é☃' + "\\" * i],
+        'error': 'quoted "}{" \\ é\U0001f600',
+    } for i in range(6)]
+    response = json.dumps(
+        {'jsonrpc': "2.0", 'id': 1, 'result': {'failed': False, 'structLogs': steps}},
+        ensure_ascii=False,
+        indent=1
+    ).encode()
+    expected = json.loads(response)['result']['structLogs']
+    for size in range(1, 40):
+        chunks = (response[i:i+size] for i in range(0, len(response), size))
+        assert list(_parse_struct_logs(chunks)) == expected
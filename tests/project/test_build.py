@@ -13,3 +13,10 @@ def test_expand_build_offsets():
     for key in ('coverageMap', 'pcMap'):
         assert expanded_json[key] == build_json[key]
         assert minified_json[key] != build_json[key]
+
+
+def test_get_selector():
+    matches = build.get_selector("0xa9059cbb")
+    assert ('Token', 'transfer') in [(i[0], i[1]['name']) for i in matches]
+    assert build.get_selector("0xa9059cbb0000") == matches
+    assert build.get_selector("0xffffffff") == []
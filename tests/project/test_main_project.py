@@ -4,6 +4,7 @@ from pathlib import Path
 import pytest
 
 from brownie import project, config
+from brownie.network.contract import _method_tables
 from brownie.project import sources
 from brownie.exceptions import ProjectAlreadyLoaded, ProjectNotFound
 
@@ -72,6 +73,13 @@ def test_close():
     project.load('tests/brownie-test-project')
 
 
+def test_close_clears_method_tables():
+    assert _method_tables
+    project.close()
+    assert not _method_tables
+    project.load('tests/brownie-test-project')
+
+
 def test_compile():
     source = sources.get('BrownieTester')
     source = source.replace('BrownieTester', 'TempTester')